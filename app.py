@@ -1,53 +1,83 @@
+import sys
+import time
+_STARTED_AT = time.perf_counter()
+
 import tkinter as tk
 from tkinter import messagebox
 
 from view.theme import AppTheme
 from view.home_view import HomeView
-from view.metadata_view import MetadataView
+from view.ui_dispatcher import UiDispatcher
 
 from controller.folder_controller import FolderController
 from controller.download_controller import DownloadController
 from controller.metadata_controller import MetadataController
 
 from service.encoder_test_service import EncoderTestService
+from controller.download_controller import AUTO_ENCODER
+from service.startup_profiler import StartupProfiler
+
+_IMPORTED_AT = time.perf_counter()
 
 VERSION = "1.1.1"
 
 class App:
-    def __init__(self):
+    def __init__(self, profiler: StartupProfiler = None):
+        self._profiler = profiler or StartupProfiler()
         self.root = tk.Tk()
         self.theme = AppTheme()
+        self._dispatcher = UiDispatcher(self.root)
+        self._profiler.mark("tk root")
 
         self._home_view: HomeView = None
-        self._metadata_view: MetadataView = None
+        self._metadata_view = None  # Built on first navigation
         self._download_controller: DownloadController = None
         self._metadata_controller: MetadataController = None
         self._folder_controller: FolderController = None
 
         self._encoder_var = tk.StringVar(value="CPU")
         self._available_encoders: list[dict] = []
+        self._encoder_benchmark: dict = {}
+        self._encoder_picked_by_user = False
+        self._encoder_tester = EncoderTestService()
 
         self._setup()
 
     def run(self):
         self.root.mainloop()
+        self._download_controller.shutdown()
 
     def _setup(self):
         self._setup_window()
         self._create_menu_bar()
+        self._profiler.mark("window and menu")
         self._initialize_views()
+        self._profiler.mark("views")
         self._initialize_controllers()
         self._wire_controllers_to_views()
+        self._profiler.mark("controllers")
         self._show_home()
+        self._dispatcher.start()
 
-        tester = EncoderTestService()
-        tester.list_available_encoder(self._on_encoders_detected)
-        
         try:
             self.root.iconbitmap('flag.ico')
         except Exception:
             pass
 
+        self.root.after_idle(self._on_first_idle)
+
+    def _on_first_idle(self):
+        self._profiler.mark("first idle (interactive)")
+        self._profiler.print_report()
+
+        # Encoder probing spawns ffmpeg processes; start it once the window is up
+        self._detect_encoders()
+
+    def _detect_encoders(self, refresh: bool = False):
+        self._encoder_tester.list_available_encoder(
+            self._dispatcher.wrap(self._on_encoders_detected, coalesce=False), refresh=refresh
+        )
+
     def _setup_window(self):
         self.root.title(f"Media Downloader {VERSION}")
         self.root.resizable(False, False)
@@ -87,11 +117,45 @@ class App:
             value="CPU",
             command=self._on_encoder_selected,
         )
+        self._settings_menu.add_command(
+            label="Re-detect encoders",
+            command=lambda: self._detect_encoders(refresh=True),
+        )
+        self._settings_menu.add_command(
+            label="Benchmark encoders",
+            command=lambda: self._benchmark_encoders(refresh=True),
+        )
         self.root.configure(menu=menubar)
 
     def _on_encoders_detected(self, encoders: list):
         self._available_encoders = encoders
+        self._download_controller.set_available_encoders(encoders)
+        self._rebuild_encoder_menu()
+        if encoders:
+            self._benchmark_encoders()
+
+    def _benchmark_encoders(self, refresh: bool = False):
+        if not self._available_encoders:
+            return
+        if refresh:
+            self._home_view.update_status("Benchmarking encoders...")
+        self._encoder_tester.benchmark_encoders(
+            self._available_encoders,
+            self._dispatcher.wrap(self._on_benchmark_done, coalesce=False),
+            refresh=refresh,
+        )
+
+    def _on_benchmark_done(self, benchmark: dict):
+        self._encoder_benchmark = benchmark
+        self._download_controller.set_encoder_benchmark(benchmark)
+        self._rebuild_encoder_menu()
+
+        fastest = EncoderTestService.pick_fastest(benchmark)
+        if fastest:
+            self._home_view.update_status(f"Fastest encoder: {fastest}")
 
+    def _rebuild_encoder_menu(self):
+        encoders = self._available_encoders
         self._encoder_menu.delete(0, 'end')
 
         if not encoders:
@@ -104,32 +168,67 @@ class App:
             )
             return
 
+        choices = []
+        if self._encoder_benchmark:
+            choices.append((AUTO_ENCODER, "Auto (fastest for each resolution)"))
         for info in encoders:
             encoder_type = info["type"]  # "QSV" / "NVENC" / "AMF" / "CPU"
-            label = f"{info.get('name', '')}"
+            if any(encoder_type == choice for choice, _ in choices):
+                continue  # H.264 and HEVC variants share one transcode path
+            choices.append((encoder_type, f"{info.get('name', '')}{self._benchmark_label(encoder_type)}"))
+
+        for encoder_type, label in choices:
             self._encoder_menu.add_radiobutton(
                 label=label,
                 variable=self._encoder_var,
                 value=encoder_type,
-                command=lambda: self._on_encoder_selected(info["type"]),
+                command=lambda encoder_type=encoder_type: self._on_encoder_clicked(encoder_type),
             )
 
-        first_type = encoders[0]["type"]
-        self._encoder_var.set(first_type)
-        self._on_encoder_selected(first_type)
+        # Keep the user's choice when the list is refreshed; otherwise take the
+        # measured fastest, or the first one until a benchmark exists
+        current = self._encoder_var.get()
+        valid = [choice for choice, _ in choices]
+        fastest = EncoderTestService.pick_fastest(self._encoder_benchmark)
+        if current in valid and (self._encoder_picked_by_user or not fastest):
+            selected = current
+        else:
+            selected = fastest if fastest in valid else valid[0]
+        self._encoder_var.set(selected)
+        self._on_encoder_selected(selected)
+
+    def _benchmark_label(self, encoder_type: str) -> str:
+        results = self._encoder_benchmark.get(encoder_type)
+        if not results:
+            return ""
+        return f" - {results.get('1080p', 0):.0f} fps @ 1080p"
 
     def _initialize_views(self):
         self._home_view = HomeView(self.root)
-        self._metadata_view = MetadataView(self.root)
-
-        for view in (self._home_view, self._metadata_view,):
-            view.place(x=0, y=0, width=560, height=600)
-            view.pack_propagate(False)
+        self._place_view(self._home_view)
+
+    def _place_view(self, view):
+        view.place(x=0, y=0, width=560, height=600)
+        view.pack_propagate(False)
+        view.set_dispatcher(self._dispatcher)
+
+    def _get_metadata_view(self):
+        if self._metadata_view is None:
+            from view.metadata_view import MetadataView
+
+            self._metadata_view = MetadataView(self.root)
+            self._place_view(self._metadata_view)
+            self._metadata_view.set_controllers(
+                metadata_controller=self._metadata_controller,
+                folder_controller=self._folder_controller,
+                home_callback=self._show_home
+            )
+        return self._metadata_view
 
     def _initialize_controllers(self):
         self._download_controller = DownloadController()
         self._folder_controller = FolderController(self._home_view.set_base_folder_path)
-        self._metadata_controller = MetadataController()
+        self._metadata_controller = MetadataController(self._download_controller.get_probe_cache())
 
     def _wire_controllers_to_views(self):
         self._home_view.set_controllers(
@@ -138,21 +237,20 @@ class App:
             metadata_callback=self._show_metadata
         )
 
-        self._metadata_view.set_controllers(
-            metadata_controller=self._metadata_controller,
-            folder_controller=self._folder_controller,
-            home_callback=self._show_home
-        )
-
         self._home_view.set_cancel_callback(self._download_controller.cancel_download)
 
+        resumable = self._download_controller.get_resumable_count()
+        if resumable:
+            self._home_view.update_status(f"{resumable} unfinished download(s) - press Resume")
+
     def _show_home(self):
         self._home_view.tkraise()
 
     def _show_metadata(self, data: dict):
         folder_path = data.get("path", "")
-        self._metadata_view.reset(data, folder_path)
-        self._metadata_view.tkraise()
+        metadata_view = self._get_metadata_view()
+        metadata_view.reset(data, folder_path)
+        metadata_view.tkraise()
 
     def _show_about(self):
         messagebox.showinfo(
@@ -164,10 +262,16 @@ class App:
             "See the yt-dlp repository for full licensing information."
         )
 
+    def _on_encoder_clicked(self, encoder_type: str):
+        self._encoder_picked_by_user = True
+        self._on_encoder_selected(encoder_type)
+
     def _on_encoder_selected(self, encoder_type: str = "CPU"):
         self._home_view.set_video_encoder(encoder_type)
 
 
 if __name__ == "__main__":
-    app = App()
+    profiler = StartupProfiler(enabled="--profile-startup" in sys.argv, started_at=_STARTED_AT)
+    profiler.mark("imports", at=_IMPORTED_AT)
+    app = App(profiler)
     app.run()
\ No newline at end of file
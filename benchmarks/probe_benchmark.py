@@ -0,0 +1,70 @@
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from model.mp4_inspector import Mp4Inspector
+from service.media_tool_runner import MediaToolRunner
+from service.video_processing_service import VideoProcessingService
+
+# Compares the in-process MP4 inspector with the ffprobe subprocess it replaces.
+#   python benchmarks/probe_benchmark.py [files...] [--ffmpeg-dir DIR] [-n 200]
+# Without files, a short H.264 test clip is generated with ffmpeg.
+
+
+def time_per_call(func, file_path: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(file_path)
+    return (time.perf_counter() - start) / iterations
+
+
+def make_sample(runner: MediaToolRunner, out_dir: str) -> str:
+    sample = str(Path(out_dir) / "sample.mp4")
+    args = [
+        "-v", "error", "-y",
+        "-f", "lavfi", "-i", "testsrc=size=1280x720:rate=30",
+        "-t", "5", "-c:v", "libx264", "-preset", "ultrafast", sample,
+    ]
+    result = runner.run("ffmpeg", args)
+    if not result.ok:
+        raise SystemExit(f"Could not create a sample clip: {result.stderr_text}")
+    return sample
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark MP4 codec probing.")
+    parser.add_argument("files", nargs="*", help="MP4 files to probe")
+    parser.add_argument("--ffmpeg-dir", help="folder containing ffmpeg/ffprobe (default: bundled, then PATH)")
+    parser.add_argument("-n", "--iterations", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    ffmpeg_dir = Path(args.ffmpeg_dir) if args.ffmpeg_dir else Path(__file__).resolve().parent.parent / "ffmpeg"
+    runner = MediaToolRunner(ffmpeg_dir)
+    has_ffprobe = Path(runner.resolve("ffprobe")).exists()
+
+    inspector = Mp4Inspector()
+    service = VideoProcessingService(ffmpeg_dir, runner=runner)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = args.files or [make_sample(runner, tmp)]
+        for file_path in files:
+            stream = inspector.probe_video_stream(file_path)
+            inproc = time_per_call(inspector.probe_video_stream, file_path, args.iterations)
+            print(f"{Path(file_path).name}: {stream}")
+            print(f"  in-process  {inproc * 1e6:10.1f} us/call")
+
+            if not has_ffprobe:
+                print("  ffprobe     skipped (not found)")
+                continue
+            # Subprocess runs are slow; fewer iterations give the same picture
+            subproc = time_per_call(service._ffprobe_video_stream, file_path, max(1, args.iterations // 10))
+            print(f"  ffprobe     {subproc * 1e6:10.1f} us/call  ({subproc / inproc:.0f}x slower)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import threading
+from pathlib import Path
+
+from controller.download_controller import DownloadController, DEFAULT_MAX_WORKERS, AUTO_ENCODER
+from service.encoder_test_service import EncoderTestService
+from service.stream_cache_service import DEFAULT_MAX_BYTES as DEFAULT_STREAM_CACHE_BYTES
+from service.video_processing_service import DEFAULT_SEGMENT_THRESHOLD_SECONDS
+from model.download_job import DownloadJob, JobState
+from model.validators import DownloadValidator
+
+# Headless entry point: same download pipeline as app.py, without importing tkinter.
+
+ENCODERS = ("CPU", "QSV", "NVENC", "AMF", AUTO_ENCODER)
+DEFAULT_QUALITY = {"mp3": "192 kbps", "mp4": "720p", "m4a": "Original", "opus": "Original"}
+
+
+def _get_app_root() -> Path:
+    if hasattr(sys, "_MEIPASS"):
+        return Path(sys._MEIPASS)
+    return Path(__file__).resolve().parent
+
+
+class HeadlessRunner:
+    def __init__(self, workers: int, ffmpeg_dir: Path, json_output: bool = False,
+                 segment_threshold: float = DEFAULT_SEGMENT_THRESHOLD_SECONDS,
+                 stream_cache_bytes: int = DEFAULT_STREAM_CACHE_BYTES):
+        self._json_output = json_output
+        self._controller = DownloadController(max_workers=workers, ffmpeg_dir=ffmpeg_dir,
+                                              segment_threshold=segment_threshold,
+                                              stream_cache_bytes=stream_cache_bytes)
+        # AUTO uses the benchmark the GUI stored for this ffmpeg build, if any
+        self._controller.set_encoder_benchmark(EncoderTestService().get_cached_benchmark())
+
+        self._last_seen: dict[int, tuple] = {}
+        self._lock = threading.Lock()
+        self._rejected = 0  # Specs that never became a job
+
+        self._controller.set_job_listener(self._on_job_update)
+
+    # Public Methods
+    def run(self, specs: list[dict], resume: bool = False) -> int:
+        jobs: list[DownloadJob] = []
+        try:
+            if resume:
+                jobs += self._controller.resume_requested(*self._batch_callbacks())
+            for spec in specs:
+                jobs += self._submit(spec)
+            self._controller.wait_for_all()
+        except KeyboardInterrupt:
+            self._emit({"event": "status", "status": "Cancelling..."}, "Cancelling...")
+            self._controller.cancel_download()
+            self._controller.wait_for_all()
+        finally:
+            self._controller.shutdown()
+
+        return self._report_summary(jobs)
+
+    # Private Methods
+    def _submit(self, spec: dict) -> list[DownloadJob]:
+        data = {key: spec.get(key, "") for key in ("url", "mode", "quality", "artist", "album")}
+        # Checked here so a bad spec counts as a failure; the controller only reports it as a status
+        error = DownloadValidator.validate(data["url"], data["mode"])
+        if error:
+            self._rejected += 1
+            self._emit({"event": "error", "url": data["url"], "status": error}, error)
+            return []
+
+        jobs = self._controller.download_requested(data, spec["output"], spec["encoder"], *self._batch_callbacks())
+        if not jobs:
+            self._emit({"event": "status", "url": data["url"], "status": "Already queued"},
+                       f"{data['url']}: already queued")
+        return jobs
+
+    def _batch_callbacks(self) -> tuple:
+        # Job errors already reach _on_job_update; the batch status would print them twice
+        def ignore(*_):
+            pass
+        return ignore, ignore, ignore, ignore
+
+    def _on_job_update(self, job: DownloadJob):
+        with self._lock:
+            if self._last_seen.get(job.job_id) == (job.status, job.state):
+                return
+            self._last_seen[job.job_id] = (job.status, job.state)
+
+        event = {"event": "job", **job.to_dict(), "stages": self._controller.get_stage_depths()}
+        self._emit(event, f"[{job.job_id}] {job.status}")
+
+    def _report_summary(self, jobs: list[DownloadJob]) -> int:
+        counts = {state.value: 0 for state in JobState}
+        for job in jobs:
+            counts[job.state.value] += 1
+        counts["rejected"] = self._rejected
+
+        summary = {"event": "summary", **counts, "extraction_cache": self._controller.get_cache_stats(),
+                   "stream_cache": self._controller.get_stream_cache_stats()}
+        text = ", ".join(f"{count} {state}" for state, count in counts.items() if count)
+        self._emit(summary, f"Finished: {text or 'nothing to do'}")
+
+        ok = not self._rejected and all(job.state in (JobState.DONE, JobState.SKIPPED) for job in jobs)
+        return 0 if ok else 1
+
+    def _emit(self, event: dict, text: str):
+        line = json.dumps(event, default=str) if self._json_output else text
+        with self._lock:
+            print(line, flush=True)
+
+
+def load_job_file(path: str) -> list[dict]:
+    # .json: a list of job objects; anything else: one URL or JSON object per line
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    if path.lower().endswith(".json"):
+        data = json.loads(text)
+        return data.get("jobs", []) if isinstance(data, dict) else data
+
+    specs = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        specs.append(json.loads(line) if line.startswith("{") else {"url": line})
+    return specs
+
+
+def default_ffmpeg_dir() -> Path:
+    bundled = _get_app_root() / "ffmpeg"
+    if bundled.exists():
+        return bundled
+    found = shutil.which("ffmpeg")
+    return Path(found).parent if found else bundled
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Download media without the GUI.")
+    parser.add_argument("urls", nargs="*", help="URLs to download")
+    parser.add_argument("-f", "--jobs-file", help="job file: .json list, or one URL / JSON object per line")
+    parser.add_argument("-m", "--mode", default="mp3", help="mp3, m4a, opus or mp4 (default: mp3); m4a/opus keep the source audio without re-encoding")
+    parser.add_argument("-q", "--quality", help='e.g. "192 kbps" or "1080p"')
+    parser.add_argument("-e", "--encoder", default="CPU", choices=ENCODERS, help="video encoder for transcoding (AUTO: fastest benchmarked)")
+    parser.add_argument("-o", "--output", default=".", help="output folder (default: current directory)")
+    parser.add_argument("--artist", default="", help="artist tag applied after download")
+    parser.add_argument("--album", default="", help="album tag applied after download")
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_MAX_WORKERS, help="parallel downloads")
+    parser.add_argument("--ffmpeg-dir", help="folder containing ffmpeg/ffprobe")
+    parser.add_argument("--segment-threshold", type=float, default=DEFAULT_SEGMENT_THRESHOLD_SECONDS,
+                        help="split CPU transcodes of videos longer than this many seconds across cores (0 = off)")
+    parser.add_argument("--stream-cache-gb", type=float, default=DEFAULT_STREAM_CACHE_BYTES / 1024 ** 3,
+                        help="disk budget for reusing downloaded streams across jobs (0 = off)")
+    parser.add_argument("--resume", action="store_true", help="also resume unfinished downloads")
+    parser.add_argument("--json", action="store_true", help="print progress as JSON lines")
+    return parser
+
+
+def build_specs(args) -> list[dict]:
+    raw_specs = [{"url": url} for url in args.urls]
+    if args.jobs_file:
+        raw_specs += load_job_file(args.jobs_file)
+
+    specs = []
+    for raw in raw_specs:
+        mode = raw.get("mode", args.mode)
+        specs.append({
+            "url": raw.get("url", ""),
+            "mode": mode,
+            "quality": raw.get("quality") or args.quality or DEFAULT_QUALITY.get(mode, ""),
+            "encoder": raw.get("encoder", args.encoder),
+            "output": os.path.abspath(raw.get("output", args.output)),
+            "artist": raw.get("artist", args.artist),
+            "album": raw.get("album", args.album),
+        })
+    return specs
+
+
+def main(argv: list[str] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    specs = build_specs(args)
+    if not specs and not args.resume:
+        parser.error("no URLs given")
+
+    for spec in specs:
+        os.makedirs(spec["output"], exist_ok=True)
+
+    ffmpeg_dir = Path(args.ffmpeg_dir) if args.ffmpeg_dir else default_ffmpeg_dir()
+    runner = HeadlessRunner(workers=args.workers, ffmpeg_dir=ffmpeg_dir, json_output=args.json,
+                            segment_threshold=args.segment_threshold,
+                            stream_cache_bytes=int(args.stream_cache_gb * 1024 ** 3))
+    return runner.run(specs, resume=args.resume)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,36 @@
 import os
+import re
 import sys
+import glob
+import itertools
 import threading
 from typing import Callable
 from pathlib import Path
 
 from model.validators import DownloadValidator
-from model.youtube_model import YoutubeModel
+from model.youtube_model import YoutubeModel, DownloadResult
+from model.download_job import DownloadJob, JobState
+from model.download_archive import DownloadArchive
+from model.job_journal import JobJournal
+from model.metadata_model import MetadataModel
+from model.video_id import VideoIdParser
+from service.audio_extraction_service import AudioExtractionService
+from service.encoder_test_service import EncoderTestService
 from service.error_service import ErrorHandlingService
-from service.video_processing_service import VideoProcessingService
+from service.extraction_cache_service import ExtractionCacheService
+from service.file_finalizer import FileFinalizer, link_or_clone
+from service.media_tool_runner import MediaToolRunner
+from service.metadata_service import MetadataService
+from service.pipeline_service import PipelineService
+from service.prefetch_service import PrefetchService
+from service.probe_cache_service import ProbeCacheService
+from service.stream_cache_service import StreamCacheService, DEFAULT_MAX_BYTES as DEFAULT_STREAM_CACHE_BYTES
+from service.transcode_scheduler import TranscodeScheduler
+from service.video_processing_service import VideoProcessingService, DEFAULT_SEGMENT_THRESHOLD_SECONDS
+
+DEFAULT_MAX_WORKERS = 3
+AUTO_ENCODER = "AUTO"  # Pick the fastest benchmarked encoder for each job's resolution
+TAG_WORKERS = 2
 
 
 def _get_app_root() -> Path:
@@ -15,67 +38,233 @@ def _get_app_root() -> Path:
         return Path(sys._MEIPASS)
     return Path(__file__).resolve().parent.parent
 
-class DownloadController:    
-    def __init__(self):
+class DownloadController:
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, ffmpeg_dir: Path = None,
+                 probe_cache: ProbeCacheService = None,
+                 segment_threshold: float = DEFAULT_SEGMENT_THRESHOLD_SECONDS,
+                 stream_cache_bytes: int = DEFAULT_STREAM_CACHE_BYTES):
         app_root = _get_app_root()
-        self._ffmpeg_dir = app_root / "ffmpeg"
-        
-        self._youtube_model = YoutubeModel(self._ffmpeg_dir)
-        self._video_processor = VideoProcessingService(self._ffmpeg_dir)
+        self._ffmpeg_dir = Path(ffmpeg_dir) if ffmpeg_dir else app_root / "ffmpeg"
+
+        self._extraction_cache = ExtractionCacheService(app_root / "cache" / "extraction")
+        self._runner = MediaToolRunner(self._ffmpeg_dir)
+        self._stream_cache = StreamCacheService(app_root / "cache" / "streams", max_bytes=stream_cache_bytes)
+        # yt-dlp finds ffmpeg on its own; hand it the same binary our runner resolved
+        self._youtube_model = YoutubeModel(self._runner.tool_dir("ffmpeg"), self._extraction_cache, self._stream_cache)
+        self._archive = DownloadArchive(app_root / "config" / "download_archive.txt")
+        self._journal = JobJournal(app_root / "config" / "job_journal.json")
+        self._probe_cache = probe_cache or ProbeCacheService(app_root / "cache" / "probe_cache.json")
+        self._finalizer = FileFinalizer(app_root / "config" / "temp_files")
+        self._finalizer.cleanup_orphans()  # Temps left by runs that crashed or were killed
+        self._video_processor = VideoProcessingService(self._ffmpeg_dir, probe_cache=self._probe_cache,
+                                                       segment_threshold=segment_threshold, runner=self._runner,
+                                                       finalizer=self._finalizer)
+        self._transcoder = TranscodeScheduler(self._video_processor)
+        self._audio_extractor = AudioExtractionService(self._runner, self._finalizer)
+        self._encoder_benchmark: dict = {}
+        self._prefetch = PrefetchService(self._youtube_model.prefetch_info)
         self._error = ErrorHandlingService()
+        self._metadata = MetadataService(metadata_model=MetadataModel(self._finalizer), error_handler=self._error,
+                                         probe_cache=self._probe_cache)
 
         self._enable_download: Callable = None
         self._enable_cancel: Callable = None
         self._update_progress: Callable = None
         self._update_status: Callable = None
-        self._cancel_flag = threading.Event()
-        self._expected_filename = None
-        self._encoder = "CPU"
+        self._job_listener: Callable = None
+
+        # download -> transcode -> tag; a job downloads while the previous one transcodes.
+        # The scheduler caps sessions per encoder, so the stage only needs enough workers to fill them.
+        self._pipeline = PipelineService([
+            ("download", self._make_stage("download", self._stage_download), max_workers),
+            ("transcode", self._make_stage("transcode", self._stage_transcode), self._transcoder.max_concurrency()),
+            ("tag", self._make_stage("tag", self._stage_tag), TAG_WORKERS),
+        ])
+        self._job_ids = itertools.count(1)
+        self._jobs_lock = threading.Lock()
+        self._jobs: dict[int, DownloadJob] = {}
+        self._batch: list[DownloadJob] = []
 
     # Public Methods
     def download_requested(
-            self, 
-            data: dict, 
+            self,
+            data: dict,
             path: str,
-            encoder: str, 
+            encoder: str,
             enable_download: Callable,
             enable_cancel: Callable,
-            update_progress: Callable, 
+            update_progress: Callable,
             update_status: Callable
-    ):
+    ) -> list[DownloadJob]:
 
         self._set_callbacks(enable_download, enable_cancel, update_progress, update_status)
-        self._enable_download(False)
-        self._enable_cancel(True)
-        self._encoder = encoder
 
-        url = data.get("url", "")
+        urls = self._split_urls(data.get("url", ""))
         mode = data.get("mode", "")
         quality = data.get("quality", "")
+        artist = data.get("artist", "")
+        album = data.get("album", "")
 
-        if not self._validate_data(url, mode):
-            self._enable_download(True)
+        if not self._validate_data(urls, mode):
+            return []
+
+        # Jobs with the same key would write the same .part and final files at once
+        active_keys = self._active_journal_keys()
+        new_urls = [u for u in urls if DownloadJob.make_journal_key(u, mode, quality, path) not in active_keys]
+        if not new_urls:
+            self._update_status("Already downloading")
+            return []
+
+        jobs = [self._create_job(url, mode, quality, path, encoder, artist, album) for url in new_urls]
+        for job in jobs:
+            self._pipeline.submit(job)
+
+        self._enable_cancel(True)
+        self._report_batch_progress()
+        status = f"Queued {len(jobs)} download(s)" if len(jobs) > 1 else "Downloading"
+        skipped = len(urls) - len(new_urls)
+        self._update_status(f"{status} ({skipped} already downloading)" if skipped else status)
+        return jobs
+
+    def preview_requested(self, url_text: str, mode: str, choices: list[str], on_options: Callable):
+        # Extracts a pasted URL in the background so the quality list shows what the video
+        # really offers, and the download later starts from the cached extraction.
+        # on_options([(value, label), ...]) runs on a worker thread; [] means keep the fixed choices.
+        urls = self._split_urls(url_text)
+        if len(urls) != 1 or not DownloadValidator.is_url(urls[0]):
+            self._prefetch.cancel()  # Drops the result of an extraction for an older URL
+            on_options([])
             return
 
-        if mode == 'mp4':
-            self._request_video_download(url, path, quality)
-        else:
-            self._request_audio_download(url, path, quality)    
+        self._prefetch.request(
+            urls[0],
+            callback=lambda info: on_options(self._youtube_model.get_quality_options(info, mode, choices)),
+        )
 
-        self._update_progress(0)
-        self._update_status("Downloading")
+    def resume_requested(
+            self,
+            enable_download: Callable,
+            enable_cancel: Callable,
+            update_progress: Callable,
+            update_status: Callable
+    ) -> list[DownloadJob]:
+
+        self._set_callbacks(enable_download, enable_cancel, update_progress, update_status)
+
+        active_keys = self._active_journal_keys()
+        entries = [e for key, e in self._journal.entries().items() if key not in active_keys]
+        if not entries:
+            self._update_status("Nothing to resume")
+            return []
+
+        jobs = []
+        for entry in entries:
+            job = self._create_job(entry["url"], entry["mode"], entry["quality"], entry["path"],
+                                   entry.get("encoder", "CPU"), entry.get("artist", ""), entry.get("album", ""))
+            job.partial_files.update(entry.get("partial_files", []))
+            job.downloaded_bytes = entry.get("downloaded_bytes", 0)
+            job.total_bytes = entry.get("total_bytes", 0)
+            jobs.append(job)
+            self._pipeline.submit(job)
+
+        self._enable_cancel(True)
+        self._report_batch_progress()
+        self._update_status(f"Resuming {len(jobs)} download(s)")
+        return jobs
 
     def cancel_download(self):
-        self._cancel_flag.set()
+        for job in self.get_jobs():
+            if not job.is_finished():
+                job.cancel()
         if self._update_status:
             self._update_status("Cancellation requested.....")
 
+    def discard_download(self):
+        # Cancel like cancel_download, but also throw away partial data and journal entries
+        active_keys = set()
+        for job in self.get_jobs():
+            if not job.is_finished():
+                job.discard_requested = True
+                job.cancel()
+                active_keys.add(job.journal_key)
+
+        for key, entry in self._journal.entries().items():
+            if key in active_keys:
+                continue  # Deleted by the worker once it stops writing
+            try:
+                self._delete_partial_files(entry.get("partial_files", []))
+            except OSError as e:
+                if self._update_status:
+                    self._error.handle_error(update_status=self._update_status,
+                                             custom_msg=f"Warning: Could not delete temp file: {e}")
+                continue
+            self._journal.remove(key)
+
+        if self._update_status:
+            self._update_status("Partial downloads discarded")
+
+    def get_resumable_count(self) -> int:
+        return len(self._journal.entries())
+
+    def cancel_job(self, job_id: int):
+        job = self._jobs.get(job_id)
+        if job and not job.is_finished():
+            job.cancel()
+
+    def set_job_listener(self, listener: Callable):
+        # Called with the job on every status change, from the worker thread
+        self._job_listener = listener
+
+    def get_jobs(self) -> list[DownloadJob]:
+        with self._jobs_lock:
+            return list(self._jobs.values())
+
+    def wait_for_all(self):
+        self._pipeline.wait()
+
+    def get_stage_depths(self) -> dict[str, dict]:
+        # {"download": {"queued": 2, "active": 3, "workers": 3}, "transcode": {...}, ...}
+        return self._pipeline.queue_depths()
+
+    def get_cache_stats(self) -> dict:
+        return self._extraction_cache.stats()
+
+    def get_stream_cache_stats(self) -> dict:
+        return self._stream_cache.stats()
+
+    def set_available_encoders(self, encoders: list[dict]):
+        # From EncoderTestService; requests for encoders missing here run on the CPU
+        self._transcoder.set_available_encoders(encoders)
+
+    def set_encoder_benchmark(self, benchmark: dict):
+        self._encoder_benchmark = benchmark
+
+    def get_transcode_stats(self) -> dict:
+        return self._transcoder.stats()
+
+    def get_process_stats(self) -> dict:
+        # Per-tool ffmpeg/ffprobe run counts and wall time
+        return MediaToolRunner.stats()
+
+    def get_probe_cache(self) -> ProbeCacheService:
+        # Shared with the metadata editor so both see the same per-file results
+        return self._probe_cache
+
+    def cancel_preview(self):
+        self._prefetch.cancel()
+
+    def shutdown(self):
+        self._prefetch.cancel()
+        self._youtube_model.close()
+        self._probe_cache.save()
+        self._extraction_cache.save()
+
     # Private Methods
     def _set_callbacks(
-            self, 
+            self,
             enable_download: Callable,
-            enable_cancel: Callable, 
-            update_progress: Callable, 
+            enable_cancel: Callable,
+            update_progress: Callable,
             update_status: Callable
     ):
         self._enable_download: Callable = enable_download
@@ -83,89 +272,328 @@ class DownloadController:
         self._update_progress: Callable = update_progress
         self._update_status: Callable = update_status
 
-    def _validate_data(self, url: str, mode: str):
-        error_msg = DownloadValidator.validate(url, mode)
-        if error_msg:
-            self._error.handle_error(update_status=self._update_status, custom_msg=error_msg)
-            return False
+    def _split_urls(self, text: str) -> list[str]:
+        urls = [u for u in re.split(r"[\s,]+", text or "") if u]
+        return list(dict.fromkeys(urls))  # Drop duplicates, keep order
+
+    def _validate_data(self, urls: list[str], mode: str):
+        for url in urls or [""]:
+            error_msg = DownloadValidator.validate(url, mode)
+            if error_msg:
+                self._error.handle_error(update_status=self._update_status, custom_msg=error_msg)
+                return False
         return True
-        
-    def _request_audio_download(self, url: str, folderPath: str, quality: str):
-        thread = threading.Thread(target=self._run_audio_download, args=(url, folderPath, quality), daemon=True)
-        thread.start()
-
-    def _request_video_download(self, url: str, folderPath: str, quality: str):
-        thread = threading.Thread(target=self._run_video_download,args=(url, folderPath, quality),daemon=True)
-        thread.start()
-    
-    def _run_audio_download(self, url: str, folderPath: str, quality: str):
-        try:
-            self._youtube_model.audio_download(url=url, 
-                                             out_dir=folderPath, 
-                                             quality=quality, 
-                                             progress_hook = self._progress_hook
-                                            )
-            self._update_status("Done")
 
-        except Exception as e:
-            if self._cancel_flag.is_set():
-                self._cleanup_partial_files()
-            self._error.handle_error(update_status=self._update_status, error=e)
-        finally:
-            self._cancel_flag.clear()
-            self._enable_download(True)
+    def _active_journal_keys(self) -> set[str]:
+        return {job.journal_key for job in self.get_jobs() if not job.is_finished()}
+
+    def _create_job(self, url: str, mode: str, quality: str, path: str, encoder: str,
+                    artist: str = "", album: str = "") -> DownloadJob:
+        job = DownloadJob(next(self._job_ids), url, mode, quality, path, encoder, artist, album)
+        with self._jobs_lock:
+            self._jobs[job.job_id] = job
+            if all(j.is_finished() for j in self._batch):
+                self._batch = []
+            self._batch.append(job)
+        return job
+
+    def _make_stage(self, name: str, handler: Callable) -> Callable:
+        def run_stage(job: DownloadJob):
+            return self._run_stage(job, name, handler)
+        return run_stage
 
-    def _run_video_download(self, url: str, folderPath: str, quality: str):
+    def _run_stage(self, job: DownloadJob, stage: str, handler: Callable):
+        # Shared cancel/failure handling around every stage; returns where the job goes next
+        if job.is_cancelled():
+            job.state = JobState.CANCELLED
+            if stage == "download":
+                if job.discard_requested:
+                    self._journal.remove(job.journal_key)
+                self._set_job_status(job, "Download cancelled")
+            else:
+                self._on_job_cancelled(job)
+            self._on_job_finished(job)
+            return None
+
+        job.stage = stage
         try:
-            downloaded_file = self._youtube_model.video_download(
-                url=url,
-                out_dir=folderPath,
-                quality=quality,
-                progress_hook = self._progress_hook
-            )
-            if downloaded_file and not self._cancel_flag.is_set():
-                self._update_status("Transcoding video...")
-                self._video_processor.transcode(downloaded_file,self._encoder)
-            self._update_status("Done")
-            
+            next_stage = handler(job)
         except Exception as e:
-            if self._cancel_flag.is_set():
-                self._cleanup_partial_files()
-            self._error.handle_error(update_status=self._update_status, error=e)
-        finally:
-            self._cancel_flag.clear()
-            self._enable_download(True)
+            job.error = e
+            if job.is_cancelled():
+                job.state = JobState.CANCELLED
+                self._on_job_cancelled(job)
+            else:
+                job.state = JobState.FAILED
+                self._error.handle_error(update_status=lambda msg: self._set_job_status(job, msg), error=e)
+                if job.partial_files:
+                    self._journal.save(job.journal_key, job.to_journal())  # Network errors can resume too
+                else:
+                    self._journal.remove(job.journal_key)
+            next_stage = None
+
+        if not next_stage:
+            self._on_job_finished(job)
+        return next_stage
+
+    def _stage_download(self, job: DownloadJob):
+        job.state = JobState.RUNNING
+        self._journal.save(job.journal_key, job.to_journal())
+        self._set_job_status(job, "Downloading")
+
+        archived_file = self._find_archived(job, VideoIdParser.from_url(job.url))
+        if archived_file:
+            self._apply_result(job, DownloadResult(archived_file, None, skipped=True))
+        elif job.mode == 'mp4':
+            self._run_video_download(job)
+        elif not self._derive_audio_locally(job):
+            self._run_audio_download(job)
+
+        if job.state == JobState.SKIPPED:
+            job.progress = 100
+            self._journal.remove(job.journal_key)
+            if job.archived_source:
+                self._set_job_status(job, f"Already downloaded - copied from {job.archived_source}")
+            else:
+                self._set_job_status(job, "Already downloaded")
+            return None
+
+        if job.mode != 'mp4':
+            return "tag"
+        if job.format_plan and not job.format_plan.needs_transcode:
+            return "tag"  # Already H.264, no need to wait for a transcode slot
+        self._set_job_status(job, self._with_plan_reason(job, "Waiting to transcode..."))
+        return "transcode"
+
+    def _stage_transcode(self, job: DownloadJob):
+        if job.result:
+            encoder = self._resolve_encoder(job)
+            self._set_job_status(job, "Waiting for a free encoder...")
+            self._transcoder.transcode(
+                job.result,
+                encoder,
+                progress_callback = lambda percent, fps, eta: self._on_transcode_progress(job, percent, fps, eta),
+                is_cancelled = job.is_cancelled,
+                duration = (job.info or {}).get('duration'),
+                on_assigned = lambda encoder_type: self._on_transcode_assigned(job, encoder, encoder_type),
+            )
+        return "tag"
+
+    def _resolve_encoder(self, job: DownloadJob) -> str:
+        if job.encoder != AUTO_ENCODER:
+            return job.encoder
+        return (EncoderTestService.pick_fastest(self._encoder_benchmark, job.quality)
+                or EncoderTestService.pick_fastest(self._encoder_benchmark)
+                or "CPU")
+
+    def _on_transcode_assigned(self, job: DownloadJob, requested: str, encoder_type: str):
+        if encoder_type == requested:
+            self._set_job_status(job, f"Transcoding video on {encoder_type}...")
+        else:
+            self._set_job_status(job, f"Transcoding video on {encoder_type} ({requested} busy or unavailable)...")
+
+    def _on_transcode_progress(self, job: DownloadJob, percent: int | None, fps: float, eta: float | None):
+        details = [f"{fps:.0f} fps"] if fps else []
+        if eta is not None:
+            minutes, seconds = divmod(int(eta), 60)
+            details.append(f"ETA {minutes}:{seconds:02d}")
+        suffix = f" ({', '.join(details)})" if details else ""
+
+        if percent is None:
+            self._set_job_status(job, f"Transcoding video...{suffix}")
+            return
+        job.progress = percent
+        self._report_batch_progress()
+        self._set_job_status(job, f"Transcoding: {percent}%{suffix}")
+
+    def _stage_tag(self, job: DownloadJob):
+        if job.result and (job.artist or job.album):
+            self._set_job_status(job, "Writing tags...")
+            title = (job.info or {}).get("title") or self._metadata.get_title(job.mode, job.result)
+            if not self._metadata.apply_presets(job.mode, job.result, title, job.artist, job.album):
+                self._set_job_status(job, f"Failed to save metadata for {os.path.basename(job.result)}")
+
+        job.progress = 100
+        self._journal.remove(job.journal_key)
+        video_key = VideoIdParser.from_info(job.info) or VideoIdParser.from_url(job.url)
+        self._archive.record(DownloadArchive.make_key(video_key, job.mode, job.quality), job.result)
+        job.state = JobState.DONE
+        self._set_job_status(job, self._with_plan_reason(job, "Done"))
+        return None
+
+    def _with_plan_reason(self, job: DownloadJob, status: str) -> str:
+        # Later statuses replace earlier ones within a frame, so the planner's decision rides along
+        if not job.format_plan:
+            return status
+        return f"{status.rstrip('.')} - {job.format_plan.reason}"
+
+    def _derive_audio_locally(self, job: DownloadJob) -> bool:
+        # An MP4 (or other audio format) of the same video is already on disk; take the audio from it
+        video_key = VideoIdParser.from_url(job.url)
+        for source in self._archive.sources(video_key):
+            if not self._audio_extractor.can_use(source, job.mode):
+                continue
+            self._set_job_status(job, f"Extracting audio from {os.path.basename(source)}...")
+            result = self._audio_extractor.extract(source, job.path, job.mode, job.quality,
+                                                   info=self._extraction_cache.get(job.url),
+                                                   is_cancelled=job.is_cancelled)
+            if result:
+                self._apply_result(job, result)
+                return True
+        return False
+
+    def _run_audio_download(self, job: DownloadJob):
+        result = self._youtube_model.audio_download(url=job.url,
+                                                  out_dir=job.path,
+                                                  quality=job.quality,
+                                                  codec=job.mode,
+                                                  on_plan=lambda plan: self._on_format_planned(job, plan),
+                                                  progress_hook = self._make_progress_hook(job),
+                                                  archived_lookup = lambda info: self._find_archived(
+                                                      job, VideoIdParser.from_info(info))
+                                                 )
+        self._apply_result(job, result)
+
+    def _run_video_download(self, job: DownloadJob):
+        result = self._youtube_model.video_download(
+            url=job.url,
+            out_dir=job.path,
+            quality=job.quality,
+            progress_hook = self._make_progress_hook(job),
+            archived_lookup = lambda info: self._find_archived(job, VideoIdParser.from_info(info))
+        )
+        self._apply_result(job, result)
+
+    def _on_format_planned(self, job: DownloadJob, plan):
+        # Known before the download starts, so the post-processing status can mention it
+        job.format_plan = plan
 
-    def _progress_hook(self, d: dict):        
+    def _apply_result(self, job: DownloadJob, result: DownloadResult):
+        job.info = result.info
+        job.result = result.filepath
+        job.format_plan = result.plan
+        if result.skipped:
+            job.state = JobState.SKIPPED
+
+    def _find_archived(self, job: DownloadJob, video_key: str | None) -> str | None:
+        # The archive is global, but the file has to end up in the folder this job writes to
+        key = DownloadArchive.make_key(video_key, job.mode, job.quality)
+        archived_file = self._archive.lookup(key)
+        if not archived_file or self._is_in_folder(archived_file, job.path):
+            return archived_file
+
+        target = Path(job.path) / Path(archived_file).name
+        if not target.exists():  # A file of that name is what yt-dlp would have skipped to anyway
+            temp = self._finalizer.temp_path_for(target)
+            try:
+                link_or_clone(Path(archived_file), temp)  # Safe to share: later edits replace the file
+                self._finalizer.finalize(temp, target)
+            except OSError:
+                self._finalizer.discard(temp)
+                return None  # Download it instead
+            job.archived_source = archived_file
+        self._archive.record(key, str(target))
+        return str(target)
+
+    def _is_in_folder(self, file_path: str, folder: str) -> bool:
+        try:
+            return os.path.samefile(os.path.dirname(os.path.abspath(file_path)), folder)
+        except OSError:
+            return False
+
+    def _make_progress_hook(self, job: DownloadJob) -> Callable:
+        def progress_hook(d: dict):
+            self._progress_hook(job, d)
+        return progress_hook
+
+    def _progress_hook(self, job: DownloadJob, d: dict):
         if d['status'] == 'downloading':
             if 'filename' in d:
-                self._expected_filename = d['filename']
-                
-            total = d.get('total_bytes') or d.get('total_bytes_estimate', 1)
+                job.expected_filename = d['filename']
+                if d['filename'] not in job.partial_files:
+                    job.partial_files.add(d['filename'])
+                    self._journal.save(job.journal_key, job.to_journal())
+
+            total = d.get('total_bytes') or d.get('total_bytes_estimate') or 1
             downloaded = d.get('downloaded_bytes', 0)
-            percent = int((downloaded / total) * 100)
+            job.downloaded_bytes = downloaded
+            job.total_bytes = total
+            job.progress = min(100, int((downloaded / total) * 100))
 
-            self._update_progress(percent)
-            self._update_status(f"Downloading: {percent}%")
+            self._report_batch_progress()
+            self._set_job_status(job, f"Downloading: {job.progress}%")
 
-            if self._cancel_flag.is_set():
-                self._enable_cancel(False)
+            if job.is_cancelled():
                 raise Exception("Download cancelled by user")
-        
+
         elif d['status'] == 'finished':
-            self._update_status("Processing file...")
+            self._set_job_status(job, self._with_plan_reason(job, "Processing file..."))
+
+    def _set_job_status(self, job: DownloadJob, status: str):
+        job.status = status
+        if self._job_listener:
+            self._job_listener(job)
+        if not self._update_status:
+            return
+
+        with self._jobs_lock:
+            batch = list(self._batch)
+        if len(batch) > 1 and job in batch:
+            position = batch.index(job) + 1
+            status = f"[{position}/{len(batch)}] {status}"
+        self._update_status(status)
 
-    def _cleanup_partial_files(self):
-        if not self._expected_filename:
+    def _report_batch_progress(self):
+        with self._jobs_lock:
+            batch = list(self._batch)
+        if not batch or not self._update_progress:
             return
-        
-        part_file = self._expected_filename + ".part"
-        
+        total = sum(100 if job.is_finished() else job.progress for job in batch)
+        self._update_progress(int(total / len(batch)))
+
+    def _on_job_finished(self, job: DownloadJob):
+        self._report_batch_progress()
+        if self._job_listener:
+            self._job_listener(job)
+
+        with self._jobs_lock:
+            batch = list(self._batch)
+        if not all(j.is_finished() for j in batch):
+            return
+
+        if self._enable_cancel:
+            self._enable_cancel(False)
+        if self._enable_download:
+            self._enable_download(True)
+
+        if len(batch) > 1 and self._update_status:
+            done = sum(1 for j in batch if j.state in (JobState.DONE, JobState.SKIPPED))
+            skipped = sum(1 for j in batch if j.state == JobState.SKIPPED)
+            summary = f"Finished {done}/{len(batch)} downloads"
+            self._update_status(f"{summary} ({skipped} already downloaded)" if skipped else summary)
+
+    def _on_job_cancelled(self, job: DownloadJob):
+        if not job.discard_requested:
+            # Keep .part/.ytdl files; yt-dlp continues from them when the job is resumed
+            self._journal.save(job.journal_key, job.to_journal())
+            self._set_job_status(job, "Download cancelled - partial data kept for resume")
+            return
+
         try:
-            if os.path.exists(part_file):
-                os.remove(part_file)
+            self._delete_partial_files(job.partial_files)
+            self._set_job_status(job, "Download discarded")
         except Exception as e:
             self._error.handle_error(
-                update_status = self._update_status,
-                custom_msg = f"Warning: Could not delete temp file: {e}"   
-            )
\ No newline at end of file
+                update_status = lambda msg: self._set_job_status(job, msg),
+                custom_msg = f"Warning: Could not delete temp file: {e}"
+            )
+        finally:
+            self._journal.remove(job.journal_key)
+
+    def _delete_partial_files(self, filenames):
+        for filename in filenames:
+            candidates = [filename, filename + ".part", filename + ".ytdl"]
+            candidates += glob.glob(glob.escape(filename) + ".part-Frag*")
+            for candidate in candidates:
+                if os.path.exists(candidate):
+                    os.remove(candidate)
@@ -7,6 +7,8 @@ class FolderController:
         self._folder_model = FolderModel()
         self._AUDIO_EXT = (".mp3", ".aac", ".m4a", ".flac", ".ogg", ".opus", ".wav", ".wma")
         self._VIDEO_EXT = (".mp4", ".mkv", ".mov", ".avi", ".webm", ".flv")
+        self._M4A_EXT = (".m4a",)
+        self._OPUS_EXT = (".opus", ".ogg")
         
         self._set_base_folder = set_base_folder
         self._new_path = self._folder_model.get_base_directory()
@@ -37,6 +39,10 @@ class FolderController:
     def get_files(self, folder_path, mode):
         if mode == "mp3":
             extensions = self._AUDIO_EXT
+        elif mode == "m4a":
+            extensions = self._M4A_EXT
+        elif mode == "opus":
+            extensions = self._OPUS_EXT
         elif mode == "mp4":
             extensions = self._VIDEO_EXT
         
@@ -6,11 +6,13 @@ from model.metadata_model import MetadataModel
 
 from service.error_service import ErrorHandlingService
 from service.metadata_service import MetadataService
+from service.probe_cache_service import ProbeCacheService
 
 class MetadataController:
-    def __init__(self):
+    def __init__(self, probe_cache: ProbeCacheService = None):
         self._error = ErrorHandlingService()
-        self._service = MetadataService(metadata_model=MetadataModel(), error_handler=self._error)
+        self._service = MetadataService(metadata_model=MetadataModel(), error_handler=self._error,
+                                        probe_cache=probe_cache)
 
         self._files = []
         self._current_index = 0        
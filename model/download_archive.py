@@ -0,0 +1,75 @@
+import os
+import threading
+from pathlib import Path
+
+
+class DownloadArchive:
+    # Append-only "<key>\t<file path>" log, loaded once into a dict for O(1) lookups.
+    # Also indexed by video, so other formats of an already downloaded video can be found.
+    def __init__(self, archive_path: Path):
+        self._archive_path = Path(archive_path)
+        self._archive_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries: dict[str, str] = None  # Loaded on first use, large archives take a while
+        self._by_video: dict[str, dict[str, str]] = {}  # video key -> {archive key: file path}
+
+    # Public Methods
+    @staticmethod
+    def make_key(video_key: str | None, mode: str, quality: str) -> str | None:
+        if not video_key:
+            return None
+        quality = "".join((quality or "").split()).lower()  # "192 kbps" -> "192kbps"
+        return f"{video_key} {mode} {quality}"
+
+    def lookup(self, key: str | None) -> str | None:
+        if not key:
+            return None
+        with self._lock:
+            file_path = self._loaded().get(key)
+        if file_path and os.path.exists(file_path):
+            return file_path
+        return None
+
+    def sources(self, video_key: str | None) -> list[str]:
+        # Every file still on disk for this video, in any mode or quality, newest first
+        if not video_key:
+            return []
+        with self._lock:
+            self._loaded()
+            paths = list(self._by_video.get(video_key, {}).values())
+        return [path for path in reversed(paths) if os.path.exists(path)]
+
+    def record(self, key: str | None, file_path: str):
+        if not key or not file_path:
+            return
+        with self._lock:
+            entries = self._loaded()
+            if entries.get(key) == file_path:
+                return
+            self._add(key, file_path)
+            with open(self._archive_path, "a", encoding="utf-8") as f:
+                f.write(f"{key}\t{file_path}\n")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._loaded())
+
+    # Private Methods
+    def _loaded(self) -> dict[str, str]:
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = {}
+        if self._archive_path.exists():
+            with open(self._archive_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    key, sep, file_path = line.rstrip("\n").partition("\t")
+                    if sep:
+                        self._add(key, file_path)  # Later lines win
+        return self._entries
+
+    def _add(self, key: str, file_path: str):
+        self._entries[key] = file_path
+        by_key = self._by_video.setdefault(key.split(" ", 1)[0], {})
+        by_key.pop(key, None)  # Re-insert so the dict stays in recording order
+        by_key[key] = file_path
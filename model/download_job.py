@@ -0,0 +1,89 @@
+import threading
+from enum import Enum
+
+
+class JobState(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    SKIPPED = "skipped"
+
+
+class DownloadJob:
+    def __init__(self, job_id: int, url: str, mode: str, quality: str, path: str, encoder: str = "CPU",
+                 artist: str = "", album: str = ""):
+        self.job_id = job_id
+        self.url = url
+        self.mode = mode
+        self.quality = quality
+        self.path = path
+        self.encoder = encoder
+        self.artist = artist  # Tag presets applied once the file is final
+        self.album = album
+
+        self.state = JobState.QUEUED
+        self.stage = ""
+        self.progress = 0
+        self.status = "Queued"
+        self.result: str = None  # Final file path
+        self.info: dict = None  # yt-dlp info dict of the download
+        self.format_plan = None  # FormatPlan chosen for the download, if any
+        self.error: Exception = None
+        self.expected_filename: str = None
+        self.archived_source: str = None  # Archived file from another folder this job's result was copied from
+        self.partial_files: set[str] = set()  # Every file yt-dlp wrote to, for resume/discard
+        self.downloaded_bytes = 0
+        self.total_bytes = 0
+        self.discard_requested = False
+        self._cancel_event = threading.Event()
+
+    # Public Methods
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def is_finished(self) -> bool:
+        return self.state in (JobState.DONE, JobState.FAILED, JobState.CANCELLED, JobState.SKIPPED)
+
+    @property
+    def journal_key(self) -> str:
+        return self.make_journal_key(self.url, self.mode, self.quality, self.path)
+
+    @staticmethod
+    def make_journal_key(url: str, mode: str, quality: str, path: str) -> str:
+        # Two jobs with the same key write the same files
+        return "|".join((url, mode, quality, path))
+
+    def to_journal(self) -> dict:
+        return {
+            "url": self.url,
+            "mode": self.mode,
+            "quality": self.quality,
+            "path": self.path,
+            "encoder": self.encoder,
+            "artist": self.artist,
+            "album": self.album,
+            "state": self.state.value,
+            "downloaded_bytes": self.downloaded_bytes,
+            "total_bytes": self.total_bytes,
+            "partial_files": sorted(self.partial_files),
+        }
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "url": self.url,
+            "mode": self.mode,
+            "quality": self.quality,
+            "path": self.path,
+            "state": self.state.value,
+            "stage": self.stage,
+            "progress": self.progress,
+            "status": self.status,
+            "result": self.result,
+            "format_plan": self.format_plan.to_dict() if self.format_plan else None,
+        }
@@ -0,0 +1,232 @@
+H264_CODEC_PREFIXES = ("avc1", "avc3", "h264")
+
+# Rough libx264 "-preset fast" throughput on a desktop CPU, only used for the
+# transcode-time estimate shown to the user
+CPU_PIXELS_PER_SECOND = 1920 * 1080 * 60
+
+# LAME's CBR ladder; a source is never encoded above the first step that covers it
+MP3_BITRATES = (64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+
+QUALITY_HEIGHTS = {
+    "360p": 360,
+    "480p": 480,
+    "720p": 720,
+    "1080p": 1080,
+    "2K": 1440,
+    "4K": 2160,
+}
+
+
+class FormatPlan:
+    def __init__(self, format_spec: str, video: dict | None, audio: dict | None, needs_transcode: bool,
+                 transcode_seconds: float, reason: str, audio_bitrate: int = None):
+        self.format_spec = format_spec  # e.g. "137+140", handed to yt-dlp's format selector
+        self.video = video  # None for audio-only plans
+        self.audio = audio
+        self.needs_transcode = needs_transcode
+        self.transcode_seconds = transcode_seconds  # Estimated full re-encode time of the chosen stream
+        self.reason = reason
+        self.audio_bitrate = audio_bitrate  # MP3 target in kbps, when capped below the requested quality
+
+    def to_dict(self) -> dict:
+        video = self.video or {}
+        return {
+            "format": self.format_spec,
+            "vcodec": video.get("vcodec"),
+            "height": video.get("height"),
+            "fps": video.get("fps"),
+            "abr": (self.audio or {}).get("abr"),
+            "audio_bitrate": self.audio_bitrate,
+            "needs_transcode": self.needs_transcode,
+            "transcode_seconds": round(self.transcode_seconds, 1),
+            "reason": self.reason,
+        }
+
+
+class FormatPlanner:
+    # Picks streams from an unprocessed info dict so MP4 output is H.264 without a re-encode
+    # whenever the source offers it at the best available quality
+    def __init__(self, pixels_per_second: float = CPU_PIXELS_PER_SECOND):
+        self._pixels_per_second = pixels_per_second
+
+    # Public Methods
+    def plan(self, info: dict, max_height: int) -> FormatPlan | None:
+        videos = [f for f in (info or {}).get("formats") or [] if self._is_video_only(f, max_height)]
+        if not videos:
+            return None  # Nothing to choose from; keep yt-dlp's default selector
+
+        best_quality = max(self._quality(f) for f in videos)
+        candidates = [f for f in videos if self._quality(f) == best_quality]
+        h264 = [f for f in candidates if self.is_h264(f)]
+
+        if h264:
+            video = max(h264, key=self._bitrate)
+            saved = self.estimate_transcode_seconds(info, video)
+            reason = (f"H.264 stream available at {self._label(video)}, no transcode needed "
+                      f"(saves ~{self._format_seconds(saved)})")
+            return self._make_plan(info, video, needs_transcode=False, reason=reason)
+
+        video = max(candidates, key=lambda f: (f.get("ext") == "mp4", self._bitrate(f)))
+        best_h264 = max((self._quality(f) for f in videos if self.is_h264(f)), default=None)
+        fallback = f"best H.264 is {best_h264[0]}p" if best_h264 else "no H.264 stream offered"
+        cost = self.estimate_transcode_seconds(info, video)
+        reason = (f"Using {self._codec(video)} at {self._label(video)} ({fallback}), "
+                  f"transcode needed (~{self._format_seconds(cost)})")
+        return self._make_plan(info, video, needs_transcode=True, reason=reason)
+
+    def plan_audio(self, info: dict, target_kbps: int) -> FormatPlan | None:
+        # Encoding a 128 kbps source at 320 kbps only makes a bigger file, so cap the
+        # MP3 bitrate at the first step at or above the source's
+        audio = self._best_audio(info)
+        source_kbps = audio and (audio.get("abr") or audio.get("tbr"))
+        if not source_kbps:
+            return None  # Unknown bitrate; keep the requested quality
+
+        cap = next((rate for rate in MP3_BITRATES if rate >= source_kbps), MP3_BITRATES[-1])
+        if cap >= target_kbps:
+            return None
+        codec = (audio.get("acodec") or "unknown").split(".")[0]
+        reason = f"Source audio is {source_kbps:.0f} kbps {codec}, encoding MP3 at {cap} kbps instead of {target_kbps}"
+        return FormatPlan(audio["format_id"], None, audio, needs_transcode=False, transcode_seconds=0,
+                          reason=reason, audio_bitrate=cap)
+
+    def quality_options(self, info: dict, mode: str, choices: list[str]) -> list[tuple[str, str]]:
+        # [(value, label)] for the choices this video really offers, e.g. ("720p", "720p (~48 MB)").
+        # Empty when the info has no format list, so the caller keeps its fixed choices.
+        duration = (info or {}).get("duration") or 0
+        if mode == "mp4":
+            return self._video_options(info, choices, duration)
+        if mode == "mp3":
+            return self._mp3_options(info, choices, duration)
+
+        audio = self._passthrough_audio(info, mode)
+        if not audio:
+            return []
+        kbps = audio.get("abr") or audio.get("tbr") or 0
+        details = [self._format_size(self._stream_size(audio, duration))]
+        details.append(f"{kbps:.0f} kbps" if kbps else None)
+        return [(value, self._with_details(value, details)) for value in choices]
+
+    @staticmethod
+    def is_h264(fmt: dict) -> bool:
+        return (fmt.get("vcodec") or "").lower().startswith(H264_CODEC_PREFIXES)
+
+    def estimate_transcode_seconds(self, info: dict, video: dict) -> float:
+        height = video.get("height") or 0
+        width = video.get("width") or height * 16 // 9
+        fps = video.get("fps") or 30
+        duration = (info or {}).get("duration") or 0
+        return duration * fps * width * height / self._pixels_per_second
+
+    # Private Methods
+    def _make_plan(self, info: dict, video: dict, needs_transcode: bool, reason: str) -> FormatPlan:
+        audio = self._pick_audio(info)
+        format_spec = f"{video['format_id']}+{audio['format_id']}" if audio else video["format_id"]
+        return FormatPlan(format_spec, video, audio, needs_transcode,
+                          self.estimate_transcode_seconds(info, video), reason)
+
+    def _pick_audio(self, info: dict) -> dict | None:
+        audios = self._audio_formats(info)
+        if not audios:
+            return None
+        # m4a (AAC) muxes into mp4 without conversion
+        return max(audios, key=lambda f: (f.get("ext") == "m4a", f.get("abr") or f.get("tbr") or 0))
+
+    def _best_audio(self, info: dict) -> dict | None:
+        # Codec doesn't matter when the audio is re-encoded anyway
+        return max(self._audio_formats(info), key=lambda f: f.get("abr") or f.get("tbr") or 0, default=None)
+
+    def _audio_formats(self, info: dict) -> list[dict]:
+        return [
+            f for f in (info or {}).get("formats") or []
+            if f.get("format_id") and f.get("vcodec") == "none" and f.get("acodec") not in (None, "none")
+        ]
+
+    def _video_options(self, info: dict, choices: list[str], duration: float) -> list[tuple[str, str]]:
+        heights = {f.get("height") for f in (info or {}).get("formats") or [] if self._is_video_only(f, 10 ** 5)}
+        options = []
+        lower = 0
+        for value in choices:
+            height = QUALITY_HEIGHTS.get(value)
+            if not height:
+                continue
+            # A choice exists if some stream falls between it and the next smaller choice
+            if any(lower < h <= height for h in heights):
+                plan = self.plan(info, height)
+                size = self._stream_size(plan.video, duration) + self._stream_size(plan.audio, duration)
+                details = [self._format_size(size), "transcode" if plan.needs_transcode else None]
+                options.append((value, self._with_details(value, details)))
+            lower = height
+        return options
+
+    def _mp3_options(self, info: dict, choices: list[str], duration: float) -> list[tuple[str, str]]:
+        audio = self._best_audio(info)
+        source_kbps = audio and (audio.get("abr") or audio.get("tbr"))
+        if not source_kbps:
+            return []
+        cap = next((rate for rate in MP3_BITRATES if rate >= source_kbps), MP3_BITRATES[-1])
+
+        options = []
+        for value in choices:
+            kbps = int(value.split()[0]) if value.split()[0].isdigit() else 0
+            if kbps > cap:
+                # Every higher choice encodes at the cap, so offer just the first of them
+                size = duration * cap * 1000 / 8
+                options.append((value, self._with_details(value, [self._format_size(size), f"capped at {cap}"])))
+                break
+            size = duration * kbps * 1000 / 8
+            options.append((value, self._with_details(value, [self._format_size(size)])))
+        return options
+
+    def _passthrough_audio(self, info: dict, mode: str) -> dict | None:
+        audios = self._audio_formats(info)
+        if mode == "m4a":
+            audios = [f for f in audios if f.get("ext") == "m4a"] or audios
+        elif mode == "opus":
+            audios = [f for f in audios if (f.get("acodec") or "").startswith("opus")] or audios
+        return max(audios, key=lambda f: f.get("abr") or f.get("tbr") or 0, default=None)
+
+    def _stream_size(self, fmt: dict | None, duration: float) -> float:
+        if not fmt:
+            return 0
+        size = fmt.get("filesize") or fmt.get("filesize_approx")
+        if size:
+            return size
+        return duration * (fmt.get("tbr") or fmt.get("abr") or fmt.get("vbr") or 0) * 1000 / 8
+
+    def _format_size(self, size: float) -> str | None:
+        if not size:
+            return None
+        if size < 1024 ** 3:
+            return f"~{size / 1024 ** 2:.0f} MB"
+        return f"~{size / 1024 ** 3:.1f} GB"
+
+    def _with_details(self, value: str, details: list) -> str:
+        details = [d for d in details if d]
+        return f"{value} ({', '.join(details)})" if details else value
+
+    def _is_video_only(self, fmt: dict, max_height: int) -> bool:
+        return (
+            bool(fmt.get("format_id"))
+            and fmt.get("vcodec") not in (None, "none")
+            and fmt.get("acodec") == "none"
+            and 0 < (fmt.get("height") or 0) <= max_height
+        )
+
+    def _quality(self, fmt: dict) -> tuple:
+        return fmt.get("height") or 0, round(fmt.get("fps") or 0)
+
+    def _bitrate(self, fmt: dict) -> float:
+        return fmt.get("vbr") or fmt.get("tbr") or 0
+
+    def _codec(self, fmt: dict) -> str:
+        return (fmt.get("vcodec") or "unknown").split(".")[0]
+
+    def _label(self, fmt: dict) -> str:
+        height, fps = self._quality(fmt)
+        return f"{height}p{fps}" if fps > 30 else f"{height}p"
+
+    def _format_seconds(self, seconds: float) -> str:
+        if seconds < 60:
+            return f"{seconds:.0f}s"
+        return f"{seconds / 60:.1f} min"
@@ -0,0 +1,41 @@
+import os
+import json
+import threading
+from pathlib import Path
+
+
+class JobJournal:
+    def __init__(self, journal_path: Path):
+        self._journal_path = Path(journal_path)
+        self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = self._load()
+
+    # Public Methods
+    def save(self, key: str, entry: dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._write()
+
+    def remove(self, key: str):
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._write()
+
+    def entries(self) -> dict[str, dict]:
+        with self._lock:
+            return dict(self._entries)
+
+    # Private Methods
+    def _load(self) -> dict:
+        try:
+            with open(self._journal_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self):
+        temp_path = self._journal_path.with_suffix(".tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=4)
+        os.replace(temp_path, self._journal_path)
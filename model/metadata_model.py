@@ -1,55 +1,126 @@
-from mutagen.mp3 import MP3
-from mutagen.mp4 import MP4
-from mutagen.id3 import ID3, TIT2, TPE1, TALB
+# mutagen is imported inside the methods so it only loads on first metadata use
+import os
+
+from service.file_finalizer import FileFinalizer
 
 MP4_TITLE_TAG   = "\xa9nam"
 MP4_ARTIST_TAG  = "\xa9ART"
+MP4_ALBUM_TAG   = "\xa9alb"
 MP4_COMMENT_TAG = "\xa9cmt"
 
+MP4_AUDIO_EXT = (".m4a", ".mp4")
+VORBIS_EXT = (".opus", ".ogg")  # Ogg containers carry Vorbis comments
+
 class MetadataModel:
+    def __init__(self, finalizer: FileFinalizer = None):
+        # mutagen edits in place and may shift the whole file when the tags grow, so
+        # tags are written to a clone of the file that then replaces the original
+        self._finalizer = finalizer or FileFinalizer()
+
     def get_audio_title(self, file_path):
         try:
+            extension = os.path.splitext(file_path)[1].lower()
+            if extension in MP4_AUDIO_EXT:
+                return self.get_video_title(file_path)
+            if extension in VORBIS_EXT:
+                return self._get_vorbis_title(file_path)
+
+            from mutagen.mp3 import MP3
+            from mutagen.id3 import ID3
             audio = MP3(file_path, ID3=ID3)
             return str(audio.tags.get('TIT2', "")) if audio.tags else ""
         except Exception:
             return ""
-        
+
     def get_video_title(self, file_path):
+        from mutagen.mp4 import MP4
         try:
-            from mutagen.mp4 import MP4
             video = MP4(file_path)
             return video.get(MP4_TITLE_TAG, [""])[0]
         except Exception:
             return ""
 
     def set_audio_metadata(self, file_path: str, title: str, artist: str, album: str) -> bool:
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension in MP4_AUDIO_EXT:
+            return self._set_mp4_audio_metadata(file_path, title, artist, album)
+        if extension in VORBIS_EXT:
+            return self._set_vorbis_metadata(file_path, title, artist, album)
+
+        from mutagen.mp3 import MP3
+        from mutagen.id3 import ID3, TIT2, TPE1, TALB
         try:
-            audio = MP3(file_path, ID3=ID3)
-            if audio.tags is None:
-                audio.add_tags()
-            audio.tags["TIT2"] = TIT2(encoding=3, text=title)
-            audio.tags["TPE1"] = TPE1(encoding=3, text=artist)
-            audio.tags["TALB"] = TALB(encoding=3, text=album)
-            
-            if "TRCK" in audio.tags:
-                del audio.tags["TRCK"]
-            
-            audio.save()
+            with self._finalizer.rewrite(file_path, copy_original=True) as temp_path:
+                audio = MP3(temp_path, ID3=ID3)
+                if audio.tags is None:
+                    audio.add_tags()
+                audio.tags["TIT2"] = TIT2(encoding=3, text=title)
+                audio.tags["TPE1"] = TPE1(encoding=3, text=artist)
+                audio.tags["TALB"] = TALB(encoding=3, text=album)
+
+                if "TRCK" in audio.tags:
+                    del audio.tags["TRCK"]
+
+                audio.save()
             return True
         except Exception as e:
             return False
-    
+
     def set_video_metadata(self, file_path: str, title: str = "", artist: str = "", comment: str = "") -> bool:
+        from mutagen.mp4 import MP4
         try:
-            video = MP4(file_path)
-            if title:
-                video[MP4_TITLE_TAG] = title      
-            if artist:
-                video[MP4_ARTIST_TAG] = artist     
-            if comment:
-                video[MP4_COMMENT_TAG] = comment    
-            
-            video.save()
+            with self._finalizer.rewrite(file_path, copy_original=True) as temp_path:
+                video = MP4(temp_path)
+                if title:
+                    video[MP4_TITLE_TAG] = title
+                if artist:
+                    video[MP4_ARTIST_TAG] = artist
+                if comment:
+                    video[MP4_COMMENT_TAG] = comment
+
+                video.save()
             return True
         except Exception as e:
-            return False
\ No newline at end of file
+            return False
+
+    # Private Methods
+    def _set_mp4_audio_metadata(self, file_path: str, title: str, artist: str, album: str) -> bool:
+        from mutagen.mp4 import MP4
+        try:
+            with self._finalizer.rewrite(file_path, copy_original=True) as temp_path:
+                audio = MP4(temp_path)
+                audio[MP4_TITLE_TAG] = title
+                audio[MP4_ARTIST_TAG] = artist
+                audio[MP4_ALBUM_TAG] = album
+                audio.pop("trkn", None)  # Same as dropping TRCK for MP3
+
+                audio.save()
+            return True
+        except Exception as e:
+            return False
+
+    def _get_vorbis_title(self, file_path: str) -> str:
+        import mutagen
+        audio = mutagen.File(file_path)  # OggOpus or OggVorbis, picked from the header
+        if audio is None or audio.tags is None:
+            return ""
+        return (audio.get("title") or [""])[0]
+
+    def _set_vorbis_metadata(self, file_path: str, title: str, artist: str, album: str) -> bool:
+        import mutagen
+        try:
+            with self._finalizer.rewrite(file_path, copy_original=True) as temp_path:
+                audio = mutagen.File(temp_path)
+                if audio is None:
+                    raise ValueError(f"Unrecognised audio file: {file_path}")
+                if audio.tags is None:
+                    audio.add_tags()
+                audio["title"] = title
+                audio["artist"] = artist
+                audio["album"] = album
+                audio.pop("tracknumber", None)
+
+                audio.save()
+            return True
+        except Exception as e:
+            return False
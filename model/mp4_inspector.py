@@ -0,0 +1,149 @@
+import os
+import math
+import struct
+
+# Sample entry fourcc -> ffprobe codec_name
+CODEC_NAMES = {
+    "avc1": "h264",
+    "avc3": "h264",
+    "hvc1": "hevc",
+    "hev1": "hevc",
+    "av01": "av1",
+    "vp09": "vp9",
+    "vp08": "vp8",
+    "mp4v": "mpeg4",
+}
+
+MAX_MOOV_BYTES = 64 * 1024 * 1024  # Bigger than any real moov; guards against garbage sizes
+
+
+class Mp4Inspector:
+    # Reads the first video track's sample description straight from the moov box,
+    # without spawning ffprobe. Returns None for anything it can't parse.
+
+    # Public Methods
+    def probe_video_stream(self, file_path: str) -> dict | None:
+        # Same keys as `ffprobe -show_entries stream=codec_name,width,height,bit_rate,avg_frame_rate,duration`
+        try:
+            with open(file_path, "rb") as f:
+                moov = self._read_moov(f, os.fstat(f.fileno()).st_size)
+                if moov is None:
+                    return None
+                return self._find_video_track(moov)
+        except (OSError, struct.error, ValueError):
+            return None
+
+    # Private Methods
+    def _read_moov(self, f, file_size: int) -> bytes | None:
+        # Only box headers are read while walking to moov, so a trailing moov
+        # behind a large mdat costs a few seeks rather than a full read
+        offset = 0
+        while offset + 8 <= file_size:
+            f.seek(offset)
+            header = f.read(16)
+            size, box_type, header_size = self._parse_header(header, file_size - offset)
+            if size < header_size:
+                return None
+            if box_type == b"moov":
+                if size > MAX_MOOV_BYTES:
+                    return None
+                f.seek(offset + header_size)
+                return f.read(size - header_size)
+            offset += size
+        return None
+
+    def _parse_header(self, data: bytes, remaining: int) -> tuple[int, bytes, int]:
+        size, box_type = struct.unpack_from(">I4s", data, 0)
+        if size == 1:
+            return struct.unpack_from(">Q", data, 8)[0], box_type, 16
+        if size == 0:
+            return remaining, box_type, 8  # Box runs to the end of the file
+        return size, box_type, 8
+
+    def _iter_boxes(self, data: bytes, start: int = 0, end: int = None):
+        end = len(data) if end is None else end
+        offset = start
+        while offset + 8 <= end:
+            size, box_type, header_size = self._parse_header(data[offset:offset + 16], end - offset)
+            if size < header_size or offset + size > end:
+                return
+            yield box_type, offset + header_size, offset + size
+            offset += size
+
+    def _find_box(self, data: bytes, start: int, end: int, box_type: bytes) -> tuple[int, int] | None:
+        for found_type, body_start, body_end in self._iter_boxes(data, start, end):
+            if found_type == box_type:
+                return body_start, body_end
+        return None
+
+    def _find_video_track(self, moov: bytes) -> dict | None:
+        for box_type, start, end in self._iter_boxes(moov):
+            if box_type != b"trak":
+                continue
+            mdia = self._find_box(moov, start, end, b"mdia")
+            if not mdia or self._handler_type(moov, *mdia) != b"vide":
+                continue
+            return self._parse_track(moov, *mdia)
+        return None
+
+    def _handler_type(self, data: bytes, start: int, end: int) -> bytes | None:
+        hdlr = self._find_box(data, start, end, b"hdlr")
+        if not hdlr:
+            return None
+        return data[hdlr[0] + 8:hdlr[0] + 12]  # version/flags, pre_defined, handler_type
+
+    def _parse_track(self, data: bytes, mdia_start: int, mdia_end: int) -> dict | None:
+        minf = self._find_box(data, mdia_start, mdia_end, b"minf")
+        stbl = minf and self._find_box(data, *minf, b"stbl")
+        stsd = stbl and self._find_box(data, *stbl, b"stsd")
+        if not stsd:
+            return None
+
+        # stsd: version/flags(4) entry_count(4), then sample entries; the first one describes the stream
+        entry = next(self._iter_boxes(data, stsd[0] + 8, stsd[1]), None)
+        if entry is None:
+            return None
+        fourcc, entry_start, entry_end = entry
+        fourcc = fourcc.decode("latin-1")
+        if fourcc not in CODEC_NAMES or entry_end - entry_start < 28:
+            return None  # e.g. encrypted "encv" entries; leave those to ffprobe
+        # VisualSampleEntry: reserved(6) data_reference_index(2) pre_defined/reserved(16) width(2) height(2)
+        width, height = struct.unpack_from(">HH", data, entry_start + 24)
+
+        stream = {
+            "codec_name": CODEC_NAMES.get(fourcc, fourcc),
+            "codec_tag_string": fourcc,
+            "width": width,
+            "height": height,
+        }
+
+        timescale, duration = self._media_duration(data, mdia_start, mdia_end)
+        if timescale and duration:
+            stream["duration"] = f"{duration / timescale:.6f}"
+        sample_count, total_bytes = self._sample_sizes(data, *stbl)
+        if timescale and duration and sample_count:
+            stream["bit_rate"] = str(int(total_bytes * 8 * timescale / duration))
+            frames, seconds = sample_count * timescale, duration
+            divisor = math.gcd(frames, seconds)
+            stream["avg_frame_rate"] = f"{frames // divisor}/{seconds // divisor}"
+        return stream
+
+    def _media_duration(self, data: bytes, start: int, end: int) -> tuple[int, int]:
+        mdhd = self._find_box(data, start, end, b"mdhd")
+        if not mdhd:
+            return 0, 0
+        body = mdhd[0]
+        if data[body] == 1:  # version 1: 64-bit creation/modification times and duration
+            return struct.unpack_from(">IQ", data, body + 20)
+        return struct.unpack_from(">II", data, body + 12)
+
+    def _sample_sizes(self, data: bytes, start: int, end: int) -> tuple[int, int]:
+        stsz = self._find_box(data, start, end, b"stsz")
+        if not stsz:
+            return 0, 0  # Fragmented files keep their samples in moof boxes
+        sample_size, sample_count = struct.unpack_from(">II", data, stsz[0] + 4)
+        if sample_size:
+            return sample_count, sample_size * sample_count
+
+        sizes = struct.unpack_from(f">{sample_count}I", data, stsz[0] + 12)
+        return sample_count, sum(sizes)
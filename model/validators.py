@@ -1,7 +1,9 @@
 import os
+from urllib.parse import urlparse
 
 class DownloadValidator:
-    SUPPORTED_MODES = {'mp3', 'mp4'}
+    AUDIO_MODES = {'mp3', 'm4a', 'opus'}  # m4a/opus keep the source stream, only the container changes
+    SUPPORTED_MODES = AUDIO_MODES | {'mp4'}
     ERROR_MESSAGES = {
         'url_missing': "Error: URL missing",
         'unsupported_mode': "Error: Unsupported mode. Supported: {}"
@@ -16,6 +18,14 @@ class DownloadValidator:
             modes_str = ", ".join(DownloadValidator.SUPPORTED_MODES)
             return DownloadValidator.ERROR_MESSAGES['unsupported_mode'].format(modes_str)
         return None
+
+    @staticmethod
+    def is_url(text):
+        try:
+            parsed = urlparse((text or "").strip())
+        except ValueError:
+            return False
+        return parsed.scheme in ("http", "https") and bool(parsed.netloc)
     
 class FolderValidator:
     @staticmethod
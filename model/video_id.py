@@ -0,0 +1,40 @@
+import re
+from urllib.parse import urlparse, parse_qs
+
+_YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YOUTUBE_HOSTS = ("youtube.com", "youtube-nocookie.com")
+_YOUTUBE_PATH_PREFIXES = ("shorts", "embed", "live", "v", "e")
+
+
+class VideoIdParser:
+    @staticmethod
+    def from_url(url: str) -> str | None:
+        # "youtube:<id>" for known URL shapes, resolved without any network access
+        try:
+            parsed = urlparse((url or "").strip())
+        except ValueError:
+            return None
+
+        host = (parsed.hostname or "").lower()
+        video_id = None
+
+        if host == "youtu.be":
+            video_id = parsed.path.strip("/").split("/")[0]
+        elif any(host == h or host.endswith("." + h) for h in _YOUTUBE_HOSTS):
+            parts = [p for p in parsed.path.split("/") if p]
+            if parts and parts[0] == "watch":
+                video_id = parse_qs(parsed.query).get("v", [""])[0]
+            elif len(parts) >= 2 and parts[0] in _YOUTUBE_PATH_PREFIXES:
+                video_id = parts[1]
+
+        if video_id and _YOUTUBE_ID.match(video_id):
+            return f"youtube:{video_id}"
+        return None
+
+    @staticmethod
+    def from_info(info: dict) -> str | None:
+        extractor = (info or {}).get("extractor_key") or (info or {}).get("ie_key")
+        video_id = (info or {}).get("id")
+        if not extractor or not video_id:
+            return None
+        return f"{extractor.lower()}:{video_id}"
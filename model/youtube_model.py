@@ -1,55 +1,80 @@
-import yt_dlp
 import os
 import sys
+from typing import Callable
 from pathlib import Path
 
+from model.format_planner import FormatPlanner, FormatPlan, QUALITY_HEIGHTS
+from model.youtube_session_pool import YoutubeSessionPool, audio_extractors
+from service.extraction_cache_service import ExtractionCacheService
+from service.stream_cache_service import StreamCacheService
+
+# Audio modes that keep the source stream; anything else falls back to a re-encode
+PASSTHROUGH_FORMATS = {
+    'm4a': 'bestaudio[ext=m4a]/bestaudio[acodec^=mp4a]/bestaudio/best',
+    'opus': 'bestaudio[acodec=opus]/bestaudio/best',
+}
+
+PREFETCH_OPTS = {'quiet': True, 'no_warnings': True}  # Extraction only, nothing is downloaded
+
+
+class DownloadResult:
+    def __init__(self, filepath: str | None, info: dict, skipped: bool = False, plan: FormatPlan = None):
+        self.filepath = filepath  # Final file, after merge/post-processing
+        self.info = info
+        self.skipped = skipped  # Already in the download archive
+        self.plan = plan  # Format choice for video downloads, None when yt-dlp's default was used
+
 
 class YoutubeModel:
-    def __init__(self, ffmpeg_dir: Path= None):
+    def __init__(self, ffmpeg_dir: Path= None, extraction_cache: ExtractionCacheService = None,
+                 stream_cache: StreamCacheService = None):
         self._ffmpeg_dir = ffmpeg_dir
+        self._extraction_cache = extraction_cache
+        self._stream_cache = stream_cache
+        # Streams already in the cache are linked into place instead of fetched
+        self._session_pool = YoutubeSessionPool(
+            download_wrapper=stream_cache.wrap_download if stream_cache else None)
+        self._format_planner = FormatPlanner()
 
-    def audio_download(self, url, out_dir, quality='192 kbps', progress_hook=None):
-        quality_value = quality.split()[0]  # "192 kbps" -> "192"
+    def audio_download(self, url, out_dir, quality='192 kbps', progress_hook=None,
+                       archived_lookup: Callable = None, codec: str = 'mp3',
+                       on_plan: Callable = None) -> DownloadResult:
+        # m4a/opus pick a source stream already in that codec, so FFmpegExtractAudio
+        # only remuxes (-acodec copy) instead of re-encoding
+        audio_format = PASSTHROUGH_FORMATS.get(codec, 'bestaudio/best')
+        extract_audio = {'key': 'FFmpegExtractAudio', 'preferredcodec': codec}
+        plan_formats = None
+        if codec not in PASSTHROUGH_FORMATS:
+            quality_value = quality.split()[0]  # "192 kbps" -> "192"
+            extract_audio['preferredquality'] = quality_value
+            if quality_value.isdigit():
+                plan_formats = lambda info: self._format_planner.plan_audio(info, int(quality_value))
 
         ydl_opts = {
-            'outtmpl': os.path.join(out_dir, '%(title)s.%(ext)s'),
+            'outtmpl': '%(title)s.%(ext)s',
             'quiet': True,
             'no_warnings': True,
-            'format': 'bestaudio/best',
+            'continuedl': True,  # Resume from .part files left by cancelled jobs
+            'format': audio_format,
             'ffmpeg_location': str(self._ffmpeg_dir),
             'postprocessors': [
-                {
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': quality_value,
-                },
+                extract_audio,
                 {
                     'key': 'FFmpegMetadata',
                 }
             ]
         }
-        if progress_hook:
-            ydl_opts['progress_hooks'] = [progress_hook]
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-
-    def video_download(self, url, out_dir, quality='720p', progress_hook=None):
-        downloaded_file = None
-
-        quality_map = {
-            "360p": 360,
-            "480p": 480,
-            "720p": 720,
-            "1080p": 1080,
-            "2K": 1440,
-            "4K": 2160,
-        }
-        height = quality_map.get(quality, 720)
-        
+        return self._download(url, ydl_opts, out_dir, progress_hook, archived_lookup, plan_formats, on_plan)
+
+    def video_download(self, url, out_dir, quality='720p', progress_hook=None,
+                       archived_lookup: Callable = None) -> DownloadResult:
+        height = QUALITY_HEIGHTS.get(quality, 720)
+
         ydl_opts = {
-            'outtmpl': os.path.join(out_dir, '%(title)s.%(ext)s'),
+            'outtmpl': '%(title)s.%(ext)s',
             'quiet': True,
             'no_warnings': True,
+            'continuedl': True,  # Resume from .part files left by cancelled jobs
             'ffmpeg_location': str(self._ffmpeg_dir),
             'format': f'bestvideo[ext=mp4][height<={height}]+bestaudio[ext=m4a]/best[ext=mp4]/best',
             'merge_output_format': 'mp4',
@@ -57,10 +82,86 @@ class YoutubeModel:
                 {'key': 'FFmpegMetadata'},
             ]
         }
-        if progress_hook:
-            ydl_opts['progress_hooks'] = [progress_hook]
-        
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-            downloaded_file = ydl.prepare_filename(ydl.extract_info(url, download=False))
-        return downloaded_file
\ No newline at end of file
+        # The format string above stays as the fallback for sites without a usable format list
+        plan_formats = lambda info: self._format_planner.plan(info, height)
+        return self._download(url, ydl_opts, out_dir, progress_hook, archived_lookup, plan_formats)
+
+    def prefetch_info(self, url: str) -> dict | None:
+        # Extracts ahead of a download and leaves the result in the extraction cache,
+        # so the download that follows starts fetching right away
+        with self._session_pool.session(PREFETCH_OPTS, "") as ydl:
+            info, _ = self._extract(ydl, url)
+        return info
+
+    def get_quality_options(self, info: dict, mode: str, choices: list[str]) -> list[tuple[str, str]]:
+        return self._format_planner.quality_options(info, mode, choices)
+
+    def close(self):
+        self._session_pool.close_all()
+
+    def get_session_stats(self) -> dict:
+        return self._session_pool.stats()
+
+    # Private Methods
+    def _download(self, url, ydl_opts, out_dir, progress_hook=None, archived_lookup=None,
+                  plan_formats: Callable = None, on_plan: Callable = None) -> DownloadResult:
+        # Sessions are pooled per option profile; out_dir and the hook are bound per job
+        with self._session_pool.session(ydl_opts, out_dir, progress_hook) as ydl:
+            info, from_cache = self._extract(ydl, url)
+
+            # URLs without an offline-parsable ID can only be checked once extracted
+            archived_file = archived_lookup(info) if archived_lookup else None
+            if archived_file:
+                return DownloadResult(archived_file, info, skipped=True)
+
+            plan = self._apply_format_plan(ydl, info, plan_formats, on_plan)
+            try:
+                info = ydl.process_ie_result(info, download=True)
+            except Exception as e:
+                if not from_cache or "cancelled by user" in str(e).lower():
+                    raise
+                # Cached stream URLs may have expired early; extract once more
+                self._extraction_cache.invalidate(url)
+                info, _ = self._extract(ydl, url)
+                plan = self._apply_format_plan(ydl, info, plan_formats, on_plan)
+                info = ydl.process_ie_result(info, download=True)
+            return DownloadResult(self._final_filepath(ydl, info), info, plan=plan)
+
+    def _apply_format_plan(self, ydl, info: dict, plan_formats: Callable = None,
+                           on_plan: Callable = None) -> FormatPlan | None:
+        # The session restores its default selector and bitrate when the job releases it
+        plan = plan_formats(info) if plan_formats else None
+        if plan:
+            ydl.format_selector = ydl.build_format_selector(plan.format_spec)
+            if plan.audio_bitrate:
+                for pp in audio_extractors(ydl):
+                    pp._preferredquality = float(plan.audio_bitrate)
+        if on_plan:
+            on_plan(plan)  # Before the download starts, so the status can show it while encoding
+        return plan
+
+    def _extract(self, ydl, url) -> tuple[dict, bool]:
+        if self._extraction_cache:
+            cached = self._extraction_cache.get(url)
+            if cached is not None:
+                return cached, True
+
+        # process=False keeps format selection out, so one entry serves every mode/quality
+        info = ydl.extract_info(url, download=False, process=False)
+        if self._extraction_cache and info:
+            self._extraction_cache.put(url, ydl.sanitize_info(info, remove_private_keys=True))
+        return info, False
+
+    def _final_filepath(self, ydl, info: dict) -> str | None:
+        if not info:
+            return None
+
+        # Set by yt-dlp after merging and post-processing (e.g. .webm -> .mp3)
+        downloads = info.get('requested_downloads') or []
+        for download in reversed(downloads):
+            if download.get('filepath'):
+                return download['filepath']
+
+        if info.get('_type', 'video') != 'video':
+            return None
+        return ydl.prepare_filename(info)
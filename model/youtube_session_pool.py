@@ -0,0 +1,112 @@
+import json
+import threading
+from typing import Callable
+from contextlib import contextmanager
+
+DEFAULT_MAX_IDLE_PER_PROFILE = 3
+
+
+def audio_extractors(ydl) -> list:
+    # yt-dlp has no public setter for a post-processor's options once the instance exists
+    from yt_dlp.postprocessor import FFmpegExtractAudioPP
+    return [pp for pp in ydl._pps['post_process'] if isinstance(pp, FFmpegExtractAudioPP)]
+
+
+class _Session:
+    def __init__(self, ydl_opts: dict, download_wrapper: Callable = None):
+        import yt_dlp  # Loads hundreds of extractor modules; only pay for it on first download
+
+        self._progress_hook: Callable = None
+        opts = dict(ydl_opts)
+        opts['progress_hooks'] = [self._dispatch_progress]
+        self.ydl = yt_dlp.YoutubeDL(opts)
+        if download_wrapper:
+            self.ydl.dl = download_wrapper(self.ydl.dl)  # Every stream download goes through YoutubeDL.dl
+        self._default_format_selector = self.ydl.format_selector
+        # A format plan may lower the audio bitrate for one job; remember the profile's own
+        self._default_audio_quality = {pp: pp._preferredquality for pp in audio_extractors(self.ydl)}
+
+    def bind(self, out_dir: str, progress_hook: Callable = None):
+        self.ydl.params['paths'] = {'home': out_dir}
+        self._progress_hook = progress_hook
+
+    def unbind(self):
+        self.ydl.params['paths'] = {}
+        self.ydl.format_selector = self._default_format_selector
+        for pp, quality in self._default_audio_quality.items():
+            pp._preferredquality = quality
+        self._progress_hook = None
+
+    def close(self):
+        try:
+            self.ydl.close()
+        except Exception:
+            pass
+
+    def _dispatch_progress(self, d: dict):
+        if self._progress_hook:
+            self._progress_hook(d)
+
+
+class YoutubeSessionPool:
+    def __init__(self, max_idle_per_profile: int = DEFAULT_MAX_IDLE_PER_PROFILE,
+                 download_wrapper: Callable = None):
+        self._max_idle = max_idle_per_profile
+        self._download_wrapper = download_wrapper
+        self._lock = threading.Lock()
+        self._idle: dict[str, list[_Session]] = {}
+        self._created = 0
+        self._reused = 0
+
+    # Public Methods
+    @contextmanager
+    def session(self, ydl_opts: dict, out_dir: str, progress_hook: Callable = None):
+        key = self._profile_key(ydl_opts)
+        session = self._acquire(key, ydl_opts)
+        session.bind(out_dir, progress_hook)
+        try:
+            yield session.ydl
+        except BaseException:
+            # A failed or cancelled download may leave the instance mid-request
+            session.unbind()
+            session.close()
+            raise
+        session.unbind()
+        self._release(key, session)
+
+    def close_all(self):
+        with self._lock:
+            sessions = [s for idle in self._idle.values() for s in idle]
+            self._idle.clear()
+        for session in sessions:
+            session.close()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "created": self._created,
+                "reused": self._reused,
+                "idle": sum(len(idle) for idle in self._idle.values()),
+            }
+
+    # Private Methods
+    def _profile_key(self, ydl_opts: dict) -> str:
+        # Options are plain data, so their JSON form identifies the profile
+        return json.dumps(ydl_opts, sort_keys=True, default=str)
+
+    def _acquire(self, key: str, ydl_opts: dict) -> _Session:
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                self._reused += 1
+                return idle.pop()
+            self._created += 1
+        return _Session(ydl_opts, self._download_wrapper)
+
+    def _release(self, key: str, session: _Session):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self._max_idle:
+                idle.append(session)
+                return
+        session.close()
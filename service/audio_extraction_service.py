@@ -0,0 +1,70 @@
+from pathlib import Path
+from typing import Callable
+
+from model.format_planner import FormatPlanner, FormatPlan
+from model.youtube_model import DownloadResult
+from service.file_finalizer import FileFinalizer
+from service.media_tool_runner import MediaToolRunner
+
+AUDIO_EXTENSIONS = {"mp3": ".mp3", "m4a": ".m4a", "opus": ".opus"}
+
+
+class AudioExtractionService:
+    # Builds an audio-mode file from a video or audio file already on disk, instead of
+    # downloading the same audio again. m4a/opus only succeed when the source already
+    # holds that codec (stream copy); MP3 is encoded, capped like a network download.
+    def __init__(self, runner: MediaToolRunner, finalizer: FileFinalizer = None,
+                 planner: FormatPlanner = None):
+        self._runner = runner
+        self._finalizer = finalizer or FileFinalizer()
+        self._planner = planner or FormatPlanner()
+
+    # Public Methods
+    def can_use(self, source: str, mode: str) -> bool:
+        # Never derive from an MP3 (lossy to lossy) or from a file of the requested mode
+        extension = Path(source).suffix.lower()
+        return mode in AUDIO_EXTENSIONS and extension not in (".mp3", AUDIO_EXTENSIONS[mode])
+
+    def extract(self, source: str, out_dir: str, mode: str, quality: str, info: dict = None,
+                is_cancelled: Callable = None) -> DownloadResult | None:
+        # None when the source can't be used (e.g. AAC audio for an opus job); the caller downloads instead
+        target = Path(out_dir) / f"{Path(source).stem}{AUDIO_EXTENSIONS[mode]}"
+        plan = None
+        if mode == "mp3":
+            codec_args, plan = self._mp3_args(quality, info)
+        else:
+            codec_args = ["-c:a", "copy"]
+
+        temp = self._finalizer.temp_path_for(target)
+        cmd = [
+            "-y", "-nostats", "-loglevel", "error",
+            "-i", source,
+            "-map", "0:a:0",
+            *codec_args,
+            str(temp),
+        ]
+        try:
+            result = self._runner.run("ffmpeg", cmd, capture_stdout=False, is_cancelled=is_cancelled)
+        except BaseException:
+            self._finalizer.discard(temp)
+            raise
+
+        if result.cancelled:
+            self._finalizer.discard(temp)
+            raise Exception("Extraction cancelled by user")
+        if not result.ok:
+            self._finalizer.discard(temp)
+            return None
+
+        self._finalizer.finalize(temp, target)
+        return DownloadResult(str(target), info, plan=plan)
+
+    # Private Methods
+    def _mp3_args(self, quality: str, info: dict = None) -> tuple[list, FormatPlan | None]:
+        quality_value = (quality or "192").split()[0]
+        kbps = int(quality_value) if quality_value.isdigit() else 192
+        # The cached extraction still describes the source streams, so the same cap applies
+        plan = self._planner.plan_audio(info, kbps) if info else None
+        if plan:
+            kbps = plan.audio_bitrate
+        return ["-c:a", "libmp3lame", "-b:a", f"{kbps}k", "-id3v2_version", "3"], plan
@@ -1,48 +1,209 @@
+import os
+import re
 import sys
-import subprocess
+import json
 import threading
 from pathlib import Path
 from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from service.media_tool_runner import MediaToolRunner
+from service.video_processing_service import VideoProcessingService
 
 def _get_app_root() -> Path:
     if hasattr(sys, "_MEIPASS"):
         return Path(sys._MEIPASS)
     return Path(__file__).resolve().parent.parent
 
-si = subprocess.STARTUPINFO()
-si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+
+ENCODER_TESTS = [
+    ('h264_qsv', 'Intel Quick Sync (QSV)', 'QSV'),
+    ('h264_nvenc', 'NVIDIA NVENC (H.264)', 'NVENC'),
+    ('hevc_nvenc', 'NVIDIA NVENC (HEVC)', 'NVENC'),
+    ('h264_amf', 'AMD AMF (H.264)', 'AMF'),
+    ('hevc_amf', 'AMD AMF (HEVC)', 'AMF'),
+    ('libx264', 'CPU', 'CPU'),
+]
+
+# Quality levels offered by the app -> frame size used for the benchmark
+BENCHMARK_RESOLUTIONS = {
+    "360p": (640, 360),
+    "480p": (854, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "2K": (2560, 1440),
+    "4K": (3840, 2160),
+}
+BENCHMARK_SECONDS = 2  # Of 30 fps testsrc per resolution
+BENCHMARK_TIMEOUT = 60
+TEST_TIMEOUT = 5
 
 class EncoderTestService:
-    def __init__(self):
+    def __init__(self, ffmpeg_dir: Path = None):
         app_root = _get_app_root()
-        self._ffmpeg_dir = app_root / "ffmpeg"
-        self._ffmpeg_path = self._ffmpeg_dir / 'ffmpeg.exe'
-
-    def list_available_encoder(self, callback: Callable) -> list:
-        threading.Thread(target=self._check_all_encoders, args=(callback,), daemon=True).start()
-
-    def _check_all_encoders(self, callback: Callable):
-        encoders = []
-        
-        encoder_tests = [
-            ('h264_qsv', 'Intel Quick Sync (QSV)', 'QSV'),
-            ('h264_nvenc', 'NVIDIA NVENC (H.264)', 'NVENC'),
-            ('hevc_nvenc', 'NVIDIA NVENC (HEVC)', 'NVENC'),
-            ('h264_amf', 'AMD AMF (H.264)', 'AMF'),
-            ('hevc_amf', 'AMD AMF (HEVC)', 'AMF'),
-            ('libx264', 'CPU', 'CPU'),
+        self._ffmpeg_dir = Path(ffmpeg_dir) if ffmpeg_dir else app_root / "ffmpeg"
+        self._runner = MediaToolRunner(self._ffmpeg_dir)
+        self._cache_path = app_root / "config" / "encoder_cache.json"
+        self._benchmark_thread: threading.Thread = None
+
+    def list_available_encoder(self, callback: Callable, refresh: bool = False) -> list:
+        # Cached results are reported right away; the background check only
+        # re-probes when the ffmpeg binary changed or a refresh was requested.
+        cached = None if refresh else self._load_cached_encoders()
+        if cached is not None:
+            callback(cached["encoders"])
+
+        threading.Thread(target=self._check_all_encoders, args=(callback, cached), daemon=True).start()
+
+    def benchmark_encoders(self, encoders: list, callback: Callable, refresh: bool = False):
+        # callback({"NVENC": {"360p": fps, ...}, "CPU": {...}}); measured once per ffmpeg build
+        # and encoder set, in a background thread since 4K on the CPU takes a while
+        encoder_types = sorted({info["type"] for info in encoders})
+        cached = self._load_cached_encoders() or {}
+        benchmark = cached.get("benchmark")
+        if not refresh and isinstance(benchmark, dict) and sorted(benchmark) == encoder_types:
+            callback(benchmark)
+            return
+
+        if self._benchmark_thread and self._benchmark_thread.is_alive():
+            return  # Reports through the callback it was started with
+        self._benchmark_thread = threading.Thread(target=self._run_benchmark, args=(encoder_types, callback),
+                                                  daemon=True)
+        self._benchmark_thread.start()
+
+    def get_cached_benchmark(self) -> dict:
+        return (self._load_cached_encoders() or {}).get("benchmark") or {}
+
+    @staticmethod
+    def pick_fastest(benchmark: dict, quality: str = None) -> str | None:
+        # Per quality: highest fps at that size. Overall: least total time per frame
+        # across all sizes, so an encoder that fails at 4K can't win on 360p alone.
+        if not benchmark:
+            return None
+        if quality:
+            scores = {t: results.get(quality, 0) for t, results in benchmark.items()}
+            best = max(scores, key=scores.get)
+            return best if scores[best] > 0 else None
+
+        def seconds_per_frame(results: dict) -> float:
+            if any(results.get(q, 0) <= 0 for q in BENCHMARK_RESOLUTIONS):
+                return float("inf")
+            return sum(1 / results[q] for q in BENCHMARK_RESOLUTIONS)
+
+        best = min(benchmark, key=lambda t: seconds_per_frame(benchmark[t]))
+        return best if seconds_per_frame(benchmark[best]) != float("inf") else None
+
+    def _check_all_encoders(self, callback: Callable, cached: dict = None):
+        version = self._get_ffmpeg_version()
+        if cached is not None and cached.get("version") == version:
+            return
+
+        with ThreadPoolExecutor(max_workers=len(ENCODER_TESTS)) as executor:
+            results = list(executor.map(self.test_encoder_live, [test[0] for test in ENCODER_TESTS]))
+
+        encoders = [
+            {'encoder': encoder, 'name': name, 'type': type_}
+            for (encoder, name, type_), ok in zip(ENCODER_TESTS, results) if ok
         ]
-        
-        for encoder, name, type_ in encoder_tests:
-            if self.test_encoder_live(encoder):
-                encoders.append({'encoder': encoder, 'name': name, 'type': type_})
 
-        callback(encoders)    
-    
+        self._save_cached_encoders(version, encoders)
+        callback(encoders)
+
+    def _run_benchmark(self, encoder_types: list[str], callback: Callable):
+        # One encoder at a time so they don't compete for the CPU and skew each other
+        benchmark = {
+            encoder_type: {quality: self.measure_fps(encoder_type, *size)
+                           for quality, size in BENCHMARK_RESOLUTIONS.items()}
+            for encoder_type in encoder_types
+        }
+        self._save_benchmark(benchmark)
+        callback(benchmark)
+
     def test_encoder_live(self, encoder: str) -> bool:
-        cmd = [
-            str(self._ffmpeg_path), '-f', 'lavfi', '-i', 'nullsrc',
-            '-c:v', encoder, '-frames:v', '1', '-f', 'null', '-'
+        args = ['-f', 'lavfi', '-i', 'nullsrc', '-c:v', encoder, '-frames:v', '1', '-f', 'null', '-']
+        try:
+            result = self._runner.run("ffmpeg", args, timeout=TEST_TIMEOUT, capture_stdout=False)
+        except OSError:
+            return False
+        return result.ok
+
+    def measure_fps(self, encoder_type: str, width: int, height: int) -> float:
+        # Frames from the final -progress block over -benchmark's real time, which
+        # leaves out process start-up (ffmpeg's own fps reads 0 for runs under a second)
+        args = [
+            '-hide_banner', '-nostats', '-loglevel', 'info', '-benchmark',
+            '-progress', 'pipe:1',
+            '-f', 'lavfi', '-i', f'testsrc=size={width}x{height}:rate=30',
+            '-t', str(BENCHMARK_SECONDS),
+            *VideoProcessingService.build_video_encoder_args(encoder_type),
+            '-f', 'null', '-'
         ]
-        result = subprocess.run(cmd, capture_output=True, timeout=5, startupinfo=si)
-        return result.returncode == 0
\ No newline at end of file
+        try:
+            result = self._runner.run("ffmpeg", args, timeout=BENCHMARK_TIMEOUT)
+        except OSError:
+            return 0.0
+        if not result.ok:
+            return 0.0
+
+        frames = 0
+        for line in result.stdout.decode(errors="replace").splitlines():
+            key, _, value = line.partition("=")
+            if key == "frame" and value.strip().isdigit():
+                frames = int(value)
+
+        match = re.search(r"rtime=([\d.]+)s", result.stderr_text)
+        seconds = float(match.group(1)) if match else 0.0
+        return round(frames / seconds, 1) if seconds > 0 else 0.0
+
+    # Private Methods
+    def _get_ffmpeg_version(self) -> str:
+        try:
+            result = self._runner.run("ffmpeg", ['-version'], timeout=TEST_TIMEOUT)
+        except OSError:
+            return ""
+        if not result.ok:
+            return ""
+        return result.stdout.decode(errors="replace").split("\n", 1)[0].strip()
+
+    def _binary_fingerprint(self) -> dict | None:
+        ffmpeg_path = self._runner.resolve("ffmpeg")
+        try:
+            stat = os.stat(ffmpeg_path)
+        except OSError:
+            return None
+        return {"path": ffmpeg_path, "size": stat.st_size, "mtime": stat.st_mtime_ns}
+
+    def _load_cached_encoders(self) -> dict | None:
+        fingerprint = self._binary_fingerprint()
+        if fingerprint is None:
+            return None
+        try:
+            with open(self._cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("fingerprint") != fingerprint or not isinstance(cached.get("encoders"), list):
+            return None
+        return cached
+
+    def _save_cached_encoders(self, version: str, encoders: list):
+        fingerprint = self._binary_fingerprint()
+        if fingerprint is None:
+            return
+        # New encoder list, so any stored benchmark is stale
+        self._write_cache({"fingerprint": fingerprint, "version": version, "encoders": encoders})
+
+    def _save_benchmark(self, benchmark: dict):
+        cached = self._load_cached_encoders()
+        if cached is None:
+            return
+        cached["benchmark"] = benchmark
+        self._write_cache(cached)
+
+    def _write_cache(self, data: dict):
+        try:
+            self._cache_path.parent.mkdir(exist_ok=True)
+            with open(self._cache_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=4)
+        except OSError:
+            pass
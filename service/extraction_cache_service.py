@@ -0,0 +1,164 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+
+from model.video_id import VideoIdParser
+
+DEFAULT_TTL_SECONDS = 3 * 60 * 60  # Stream URLs in the info dict expire after a few hours
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ExtractionCacheService:
+    def __init__(self, cache_dir: Path, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self._cache_dir = Path(cache_dir)
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index_path = self._cache_dir / "index.json"
+        self._ttl = ttl_seconds
+        self._max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, dict] = OrderedDict()  # Least recently used first
+        self._aliases: dict[str, str] = {}  # URL -> key, for URLs we cannot parse offline
+        self._dirty = False  # LRU order changed since the index was last written
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        self._load_index()
+
+    # Public Methods
+    def get(self, url: str) -> dict | None:
+        with self._lock:
+            key = self._resolve_key(url)
+            entry = self._entries.get(key) if key else None
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            if time.time() - entry["created"] > self._ttl:
+                self._remove(key)
+                self._save_index()
+                self._misses += 1
+                return None
+
+            try:
+                with open(self._cache_dir / entry["file"], "r", encoding="utf-8") as f:
+                    info = json.load(f)
+            except (OSError, ValueError):
+                self._remove(key)
+                self._save_index()
+                self._misses += 1
+                return None
+
+            # Only the order changed; written with the next put/evict or on save()
+            self._entries.move_to_end(key)
+            self._dirty = True
+            self._hits += 1
+            return info
+
+    def put(self, url: str, info: dict):
+        key = VideoIdParser.from_info(info) or VideoIdParser.from_url(url)
+        if not key or info.get("_type", "video") != "video" or info.get("is_live"):
+            return  # Playlists and live streams are not worth caching
+
+        file_name = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json"
+        data = json.dumps(info, ensure_ascii=False).encode("utf-8")
+        if len(data) > self._max_bytes:
+            return
+
+        with self._lock:
+            self._write_file(self._cache_dir / file_name, data)
+            self._entries.pop(key, None)
+            self._entries[key] = {"file": file_name, "size": len(data), "created": time.time()}
+            if VideoIdParser.from_url(url) != key:
+                self._aliases[url] = key
+
+            self._evict()
+            self._save_index()
+
+    def invalidate(self, url: str):
+        with self._lock:
+            key = self._resolve_key(url)
+            if key in self._entries:
+                self._remove(key)
+                self._save_index()
+
+    def clear(self):
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+            self._save_index()
+
+    def save(self):
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / lookups) if lookups else 0.0,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": sum(e["size"] for e in self._entries.values()),
+            }
+
+    # Private Methods
+    def _resolve_key(self, url: str) -> str | None:
+        return VideoIdParser.from_url(url) or self._aliases.get(url)
+
+    def _evict(self):
+        now = time.time()
+        for key in [k for k, e in self._entries.items() if now - e["created"] > self._ttl]:
+            self._remove(key)
+            self._evictions += 1
+
+        total = sum(e["size"] for e in self._entries.values())
+        while self._entries and total > self._max_bytes:
+            key, entry = next(iter(self._entries.items()))
+            total -= entry["size"]
+            self._remove(key)
+            self._evictions += 1
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        self._aliases = {u: k for u, k in self._aliases.items() if k != key}
+        if entry:
+            try:
+                os.remove(self._cache_dir / entry["file"])
+            except OSError:
+                pass
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        for key, entry in index.get("entries", []):
+            if (self._cache_dir / entry["file"]).exists():
+                self._entries[key] = entry
+        self._aliases = {u: k for u, k in index.get("aliases", {}).items() if k in self._entries}
+        self._evict()
+
+    def _save_index(self):
+        index = {"entries": list(self._entries.items()), "aliases": self._aliases}
+        self._write_file(self._index_path, json.dumps(index).encode("utf-8"))
+        self._dirty = False
+
+    def _write_file(self, path: Path, data: bytes):
+        temp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
@@ -0,0 +1,249 @@
+import os
+import sys
+import json
+import shutil
+import secrets
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+
+FICLONE = 0x40049409  # Linux ioctl: copy-on-write clone on btrfs/XFS/bcachefs
+
+
+def clone_or_copy(source: Path, target: Path) -> str:
+    if _reflink(source, target):
+        return "reflink"
+    shutil.copyfile(source, target)  # Uses the kernel's copy offload where available
+    return "copy"
+
+
+def link_or_clone(source: Path, target: Path) -> str:
+    # A reflink gives the new name its own copy-on-write data; a hard link shares the data,
+    # which is only safe for files that are replaced rather than edited in place
+    if _reflink(source, target):
+        return "reflink"
+    try:
+        os.link(source, target)
+        return "hardlink"
+    except OSError:
+        shutil.copyfile(source, target)
+        return "copy"
+
+
+def _reflink(source: Path, target: Path) -> bool:
+    # Shares the data blocks, so no bytes are copied where the file system supports it
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        import fcntl
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError:
+        Path(target).unlink(missing_ok=True)
+        return False
+
+
+def open_locked(path: Path, wait: bool):
+    # Exclusive lock on a lock file; the OS releases it when the holder exits, however it exits
+    try:
+        f = open(path, "a+b")
+    except OSError:
+        return None
+    try:
+        if sys.platform == "win32":
+            import msvcrt
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK if wait else msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+def _remove_lock_file(f, path: Path):
+    # POSIX: unlink while still locked, so whoever opened it meanwhile sees a stale file and retries.
+    # Windows can't delete an open file; if someone opened it meanwhile, it stays and is theirs.
+    if sys.platform != "win32":
+        path.unlink(missing_ok=True)
+    f.close()
+    if sys.platform == "win32":
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def _get_app_root() -> Path:
+    if hasattr(sys, "_MEIPASS"):
+        return Path(sys._MEIPASS)
+    return Path(__file__).resolve().parent.parent
+
+
+class FileFinalizer:
+    # Every rewrite goes to a temp file in the target's own folder, is fsynced and
+    # then os.replace()d over the target, so a crash leaves either the old or the
+    # new file, never neither. Live temp paths are recorded in a registry per process,
+    # <pid>.json, whose <pid>.lock stays locked while the process runs, so the next start
+    # deletes what a crashed run left behind without touching other running instances.
+    _lock = threading.Lock()
+    _pending: dict[str, set[str]] = {}  # registry dir -> this process's temp paths, shared by all instances
+    _owner_locks: dict[str, object] = {}  # registry dir -> our locked lock file, held until exit
+
+    def __init__(self, registry_dir: Path = None):
+        self._registry_dir = Path(registry_dir) if registry_dir else _get_app_root() / "config" / "temp_files"
+        self._registry_path = self._registry_dir / f"{os.getpid()}.json"
+
+    # Public Methods
+    def temp_path_for(self, target: str | Path) -> Path:
+        # Same folder (so the final rename never crosses file systems), same extension (so ffmpeg/mutagen
+        # detect the format), hidden and unique
+        target = Path(target)
+        temp = target.with_name(f".{target.stem}.{secrets.token_hex(4)}.tmp{target.suffix}")
+        self._register(temp)
+        return temp
+
+    def temp_dir_for(self, target: str | Path) -> Path:
+        target = Path(target)
+        temp = target.with_name(f".{target.stem}.{secrets.token_hex(4)}.tmpdir")
+        temp.mkdir()
+        self._register(temp)
+        return temp
+
+    def finalize(self, temp: str | Path, target: str | Path):
+        temp, target = Path(temp), Path(target)
+        with open(temp, "rb+") as f:
+            os.fsync(f.fileno())
+        os.replace(temp, target)
+        self._fsync_dir(target.parent)
+        self._unregister(temp)
+
+    def discard(self, temp: str | Path):
+        temp = Path(temp)
+        if temp.is_dir():
+            shutil.rmtree(temp, ignore_errors=True)
+        else:
+            temp.unlink(missing_ok=True)
+        self._unregister(temp)
+
+    @contextmanager
+    def rewrite(self, target: str | Path, copy_original: bool = False):
+        # Yields a temp path to write the new version to; it replaces the target only if the
+        # block finishes. copy_original seeds the temp with the current bytes for in-place editors.
+        temp = self.temp_path_for(target)
+        try:
+            if copy_original:
+                clone_or_copy(Path(target), temp)
+            yield temp
+        except BaseException:
+            self.discard(temp)
+            raise
+        self.finalize(temp, target)
+
+    def cleanup_orphans(self) -> int:
+        # A registry whose lock can be taken belongs to a run that crashed or was killed;
+        # the GUI and CLI batches running alongside keep theirs locked
+        with self._lock:
+            owned = str(self._registry_dir) in self._owner_locks
+            stems = {p.stem for pattern in ("*.json", "*.lock") for p in self._registry_dir.glob(pattern)}
+            removed = 0
+            for stem in sorted(stems):
+                registry = self._registry_dir / f"{stem}.json"
+                if owned and registry == self._registry_path:
+                    continue
+                lock_path = registry.with_suffix(".lock")
+                lock = open_locked(lock_path, wait=False)
+                if lock is None:
+                    continue  # Owner still running
+                try:
+                    removed += self._delete_paths(self._load_registry(registry))
+                    registry.unlink(missing_ok=True)
+                except OSError:
+                    pass
+                finally:
+                    _remove_lock_file(lock, lock_path)
+            return removed
+
+    # Private Methods
+    def _fsync_dir(self, folder: Path):
+        if sys.platform == "win32":
+            return  # Directories can't be opened for fsync; NTFS journals the rename
+        try:
+            fd = os.open(folder, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def _register(self, temp: Path):
+        with self._lock:
+            self._claim_registry()
+            self._pending_set().add(str(temp))
+            self._save_registry()
+
+    def _unregister(self, temp: Path):
+        with self._lock:
+            self._pending_set().discard(str(temp))
+            self._save_registry()
+
+    def _claim_registry(self):
+        # Lock <pid>.lock before the first temp is registered and keep it until the process exits
+        key = str(self._registry_dir)
+        if key in self._owner_locks:
+            return
+        lock_path = self._registry_path.with_suffix(".lock")
+        try:
+            self._registry_dir.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return
+        for _ in range(3):
+            lock = open_locked(lock_path, wait=True)
+            if lock is None:
+                return  # Still usable, just not protected from another start's cleanup
+            try:
+                if os.path.samestat(os.fstat(lock.fileno()), os.stat(lock_path)):
+                    self._owner_locks[key] = lock
+                    return
+            except OSError:
+                pass
+            lock.close()  # A cleanup removed the file between our open and lock; take the new one
+
+    def _pending_set(self) -> set[str]:
+        return self._pending.setdefault(str(self._registry_dir), set())
+
+    def _load_registry(self, registry: Path) -> set[str]:
+        try:
+            with open(registry, "r", encoding="utf-8") as f:
+                return set(json.load(f))
+        except (OSError, ValueError, TypeError):
+            return set()
+
+    def _delete_paths(self, paths: set[str]) -> int:
+        removed = 0
+        for path in map(Path, paths):
+            try:
+                if path.is_dir():
+                    shutil.rmtree(path)
+                    removed += 1
+                elif path.exists():
+                    path.unlink()
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    def _save_registry(self):
+        temp = self._registry_path.with_suffix(".tmp")
+        try:
+            self._registry_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp, "w", encoding="utf-8") as f:
+                json.dump(sorted(self._pending_set()), f, indent=4)
+            os.replace(temp, self._registry_path)
+        except OSError:
+            pass
@@ -0,0 +1,170 @@
+import os
+import sys
+import time
+import shutil
+import threading
+import subprocess
+from collections import deque
+from pathlib import Path
+from typing import Callable
+
+si = None
+if sys.platform == "win32":
+    si = subprocess.STARTUPINFO()
+    si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+EXE_SUFFIX = ".exe" if sys.platform == "win32" else ""
+
+STDERR_TAIL_BYTES = 16 * 1024  # Enough for ffmpeg's closing error lines
+DEFAULT_MAX_CONCURRENT = max(4, os.cpu_count() or 4)
+POLL_SECONDS = 0.2
+
+
+class MediaToolResult:
+    def __init__(self, tool: str, args: list, returncode: int, stdout: bytes, stderr_tail: bytes,
+                 elapsed: float, cancelled: bool = False, timed_out: bool = False):
+        self.tool = tool
+        self.args = args
+        self.returncode = returncode
+        self.stdout = stdout  # None unless captured
+        self.stderr_tail = stderr_tail  # Last STDERR_TAIL_BYTES only
+        self.elapsed = elapsed  # Seconds the process ran, excluding time waiting for a slot
+        self.cancelled = cancelled
+        self.timed_out = timed_out
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not (self.cancelled or self.timed_out)
+
+    @property
+    def stderr_text(self) -> str:
+        return self.stderr_tail.decode(errors="replace").strip()
+
+
+class MediaToolRunner:
+    # Single place that starts ffmpeg/ffprobe. Binary lookup, the process slot
+    # limit and the timing stats are shared by every runner in the app.
+    _slots = threading.BoundedSemaphore(DEFAULT_MAX_CONCURRENT)
+    _resolved: dict[tuple[str, str], str] = {}
+    _stats: dict[str, dict] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, tool_dir: Path = None, stderr_limit: int = STDERR_TAIL_BYTES):
+        self._tool_dir = Path(tool_dir) if tool_dir else None
+        self._stderr_limit = stderr_limit
+
+    # Public Methods
+    def resolve(self, tool: str) -> str:
+        # Bundled folder first, then PATH. Misses aren't cached, so installing
+        # ffmpeg while the app runs is picked up.
+        key = (str(self._tool_dir), tool)
+        with self._lock:
+            if key in self._resolved:
+                return self._resolved[key]
+
+        bundled = self._tool_dir / f"{tool}{EXE_SUFFIX}" if self._tool_dir else None
+        if bundled and bundled.exists():
+            found = str(bundled)
+        else:
+            found = shutil.which(tool)
+        if not found:
+            return str(bundled) if bundled else tool  # Fails on launch with a clear "not found"
+
+        with self._lock:
+            self._resolved[key] = found
+        return found
+
+    def tool_dir(self, tool: str = "ffmpeg") -> Path:
+        # Folder to hand to tools that want a location rather than a binary (yt-dlp)
+        return Path(self.resolve(tool)).parent
+
+    def run(
+            self,
+            tool: str,
+            args: list,
+            timeout: float = None,
+            capture_stdout: bool = True,
+            on_stdout_line: Callable = None,
+            is_cancelled: Callable = None
+    ) -> MediaToolResult:
+        # on_stdout_line(bytes) streams stdout instead of capturing it. OSError
+        # (missing binary) propagates; timeouts and cancels are reported in the result.
+        cmd = [self.resolve(tool), *[str(arg) for arg in args]]
+        stdout_chunks = []
+        stderr_tail = deque()
+        stderr_size = [0]
+
+        with self._slots:
+            started = time.perf_counter()
+            process = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE if (capture_stdout or on_stdout_line) else subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                startupinfo=si,
+            )
+            readers = [threading.Thread(target=self._read_stderr, args=(process.stderr, stderr_tail, stderr_size),
+                                        daemon=True)]
+            if on_stdout_line:
+                readers.append(threading.Thread(target=self._read_lines, args=(process.stdout, on_stdout_line),
+                                                daemon=True))
+            elif capture_stdout:
+                readers.append(threading.Thread(target=lambda: stdout_chunks.append(process.stdout.read()),
+                                                daemon=True))
+            for reader in readers:
+                reader.start()
+
+            cancelled, timed_out = self._wait(process, timeout, is_cancelled)
+            for reader in readers:
+                reader.join()
+            elapsed = time.perf_counter() - started
+
+        self._record(tool, elapsed)
+        stdout = b"".join(stdout_chunks) if capture_stdout and not on_stdout_line else None
+        return MediaToolResult(tool, cmd[1:], process.returncode, stdout, b"".join(stderr_tail),
+                               elapsed, cancelled=cancelled, timed_out=timed_out)
+
+    @classmethod
+    def stats(cls) -> dict[str, dict]:
+        # {"ffmpeg": {"runs": 12, "total_seconds": 80.1, "max_seconds": 40.2}, ...}
+        with cls._lock:
+            return {tool: dict(values) for tool, values in cls._stats.items()}
+
+    # Private Methods
+    def _wait(self, process: subprocess.Popen, timeout: float = None,
+              is_cancelled: Callable = None) -> tuple[bool, bool]:
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            try:
+                process.wait(timeout=POLL_SECONDS)
+                return False, False
+            except subprocess.TimeoutExpired:
+                pass
+            if is_cancelled and is_cancelled():
+                self._kill(process)
+                return True, False
+            if deadline and time.monotonic() >= deadline:
+                self._kill(process)
+                return False, True
+
+    def _kill(self, process: subprocess.Popen):
+        # Callers throw away the output of killed runs, so skip ffmpeg's graceful flush
+        process.kill()
+        process.wait()
+
+    def _read_stderr(self, stream, tail: deque, size: list):
+        for chunk in iter(lambda: stream.read1(8192), b""):
+            tail.append(chunk)
+            size[0] += len(chunk)
+            while size[0] - len(tail[0]) >= self._stderr_limit:
+                size[0] -= len(tail.popleft())
+
+    def _read_lines(self, stream, on_line: Callable):
+        for line in stream:
+            on_line(line)
+
+    def _record(self, tool: str, elapsed: float):
+        with self._lock:
+            entry = self._stats.setdefault(tool, {"runs": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            entry["runs"] += 1
+            entry["total_seconds"] = round(entry["total_seconds"] + elapsed, 3)
+            entry["max_seconds"] = round(max(entry["max_seconds"], elapsed), 3)
@@ -4,8 +4,10 @@ from typing import Callable
 
 from service.file_service import FileRenamer
 from service.error_service import ErrorHandlingService
+from service.probe_cache_service import ProbeCacheService
 
 from model.metadata_model import MetadataModel
+from model.validators import DownloadValidator
 
 from enum import IntEnum
 class FilenameFormat(IntEnum):
@@ -14,9 +16,11 @@ class FilenameFormat(IntEnum):
     TITLE_ONLY = 3
 
 class MetadataService:
-    def __init__(self, metadata_model: MetadataModel, error_handler: ErrorHandlingService):
+    def __init__(self, metadata_model: MetadataModel, error_handler: ErrorHandlingService,
+                 probe_cache: ProbeCacheService = None):
         self._model = metadata_model
         self._error = error_handler
+        self._probe_cache = probe_cache or ProbeCacheService()
         self._video_threads: list[threading.Thread] = []
 
     # Public Methods
@@ -24,9 +28,7 @@ class MetadataService:
         self._video_threads.clear()
 
     def get_title(self, mode: str, file_path: str) -> str:
-        if mode == "mp3":
-            return self._model.get_audio_title(file_path=file_path)
-        return self._model.get_video_title(file_path=file_path)
+        return self._probe_cache.get_or_compute(file_path, f"{mode}_title", lambda path: self._read_title(mode, path))
     
     def set_metadata_for_file(
         self, mode: str, 
@@ -36,13 +38,23 @@ class MetadataService:
         file_name: str, 
         update_status: Callable
     ):
-        if mode == "mp3":
+        if mode in DownloadValidator.AUDIO_MODES:
             ok = self._model.set_audio_metadata(file_path, title, artist, album)
+            self._probe_cache.invalidate(file_path)
             if not ok:
                 update_status(f"Failed to save metadata for {file_name}")
         else:
             self._request_video_metadata_change(file_path, title, artist, album, update_status)
 
+    def apply_presets(self, mode: str, file_path: str, title: str, artist: str, album: str) -> bool:
+        # Synchronous variant of set_metadata_for_file, for callers already on a worker thread
+        if mode in DownloadValidator.AUDIO_MODES:
+            ok = self._model.set_audio_metadata(file_path, title, artist, album)
+        else:
+            ok = self._model.set_video_metadata(file_path, title, artist)
+        self._probe_cache.invalidate(file_path)
+        return ok
+
     def wait_for_all_video_operations(self):
         for thread in self._video_threads:
             thread.join()
@@ -61,17 +73,18 @@ class MetadataService:
         for filename in files:
             file_path = os.path.join(folder_path, filename)
             title = self.get_title(mode, file_path)
+            extension = os.path.splitext(filename)[1] or f".{mode}"  # Keep the container: an .opus stays .opus
 
             if not title or not title.strip():
                 update_status(f"Skipped: {filename} (no title)")
                 continue
 
             if filename_format == FilenameFormat.TITLE_ARTIST and artist:
-                new_name = f"{title} - {artist}.{mode}"
+                new_name = f"{title} - {artist}{extension}"
             elif filename_format == FilenameFormat.TITLE_ALBUM and album:
-                new_name = f"{title} - {album}.{mode}"
+                new_name = f"{title} - {album}{extension}"
             elif filename_format == FilenameFormat.TITLE_ONLY:
-                new_name = f"{title}.{mode}"
+                new_name = f"{title}{extension}"
             else:
                 continue
 
@@ -80,6 +93,11 @@ class MetadataService:
         return True
 
     # Private Methods
+    def _read_title(self, mode: str, file_path: str) -> str:
+        if mode in DownloadValidator.AUDIO_MODES:
+            return self._model.get_audio_title(file_path=file_path)
+        return self._model.get_video_title(file_path=file_path)
+
     def _request_video_metadata_change(
         self,
         file_path: str,
@@ -106,5 +124,6 @@ class MetadataService:
     ):
         try:
             self._model.set_video_metadata(file_path, title, artist)
+            self._probe_cache.invalidate(file_path)
         except Exception as e:
             self._error.handle_error(update_status, error=e)
\ No newline at end of file
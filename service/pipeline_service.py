@@ -0,0 +1,63 @@
+from typing import Callable
+
+from service.worker_pool import WorkerPool
+
+
+class PipelineStage:
+    def __init__(self, name: str, handler: Callable, max_workers: int, on_done: Callable):
+        self.name = name
+        self._handler = handler
+        self._on_done = on_done
+        self._pool = WorkerPool(self._process, max_workers=max_workers, name=name)
+
+    def submit(self, item):
+        self._pool.submit(item)
+
+    def wait(self):
+        self._pool.wait()
+
+    def depth(self) -> dict:
+        return {
+            "queued": self._pool.pending_count(),
+            "active": self._pool.active_count(),
+            "workers": self._pool.max_workers(),
+        }
+
+    def _process(self, item):
+        self._on_done(self, item, self._handler(item))
+
+
+class PipelineService:
+    # Each stage has its own queue and worker count, so item N+1 can sit in an
+    # early stage while item N is still in a later one.
+    # handler(item) returns True to hand the item to the next stage, a stage
+    # name to jump to that stage, or a falsy value when the item is finished.
+    def __init__(self, stages: list[tuple[str, Callable, int]]):
+        self._stages = [PipelineStage(name, handler, workers, self._route) for name, handler, workers in stages]
+        self._by_name = {stage.name: stage for stage in self._stages}
+
+    # Public Methods
+    def submit(self, item, stage: str = None):
+        target = self._by_name[stage] if stage else self._stages[0]
+        target.submit(item)
+
+    def wait(self):
+        # A stage hands items on before marking them done, and items only move
+        # forward, so joining the stages in order drains everything
+        for stage in self._stages:
+            stage.wait()
+
+    def queue_depths(self) -> dict[str, dict]:
+        return {stage.name: stage.depth() for stage in self._stages}
+
+    # Private Methods
+    def _route(self, stage: PipelineStage, item, result):
+        if not result:
+            return
+        if isinstance(result, str):
+            self._by_name[result].submit(item)
+            return
+
+        index = self._stages.index(stage) + 1
+        if index < len(self._stages):
+            self._stages[index].submit(item)
@@ -0,0 +1,52 @@
+import threading
+from typing import Callable
+
+
+class PrefetchService:
+    # One background worker that only cares about the latest request. A newer request
+    # replaces a queued one, and the result of one already running is dropped instead of
+    # delivered (yt-dlp can't be interrupted mid-extraction, so it's left to finish).
+    def __init__(self, fetch: Callable):
+        self._fetch = fetch
+        self._condition = threading.Condition()
+        self._generation = 0
+        self._pending: tuple | None = None  # (generation, args, callback)
+        self._thread: threading.Thread = None
+
+    # Public Methods
+    def request(self, *args, callback: Callable) -> int:
+        # callback(result) runs on the worker thread, and only if no newer request came in
+        with self._condition:
+            self._generation += 1
+            self._pending = (self._generation, args, callback)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+            return self._generation
+
+    def cancel(self):
+        with self._condition:
+            self._generation += 1
+            self._pending = None
+
+    def is_current(self, generation: int) -> bool:
+        with self._condition:
+            return generation == self._generation
+
+    # Private Methods
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None:
+                    self._condition.wait()
+                generation, args, callback = self._pending
+                self._pending = None
+
+            try:
+                result = self._fetch(*args)
+            except Exception:
+                result = None  # A bad URL just means no preview; the download reports the real error
+
+            if self.is_current(generation):
+                callback(result)
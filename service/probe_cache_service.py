@@ -0,0 +1,123 @@
+import os
+import json
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Callable
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+class ProbeCacheService:
+    # Per-file results (stream description, tag title, ...) keyed by absolute path.
+    # Each entry remembers the file's size and mtime; a lookup on a file that
+    # changed since drops the entry, so stale results are never returned.
+    def __init__(self, cache_path: Path = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self._cache_path = Path(cache_path) if cache_path else None  # None keeps it in memory only
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, dict] = None  # Loaded on first use
+        self._dirty = False
+        self._hits = 0
+        self._misses = 0
+
+    # Public Methods
+    def get_or_compute(self, file_path: str, kind: str, compute: Callable):
+        found, value = self.get(file_path, kind)
+        if found:
+            return value
+        value = compute(file_path)
+        self.put(file_path, kind, value)
+        return value
+
+    def get(self, file_path: str, kind: str) -> tuple[bool, object]:
+        path, signature = self._signature(file_path)
+        with self._lock:
+            entries = self._loaded()
+            entry = entries.get(path)
+            if entry is not None and entry["signature"] != signature:
+                del entries[path]  # File was rewritten (transcode, tag write, re-download)
+                self._dirty = True
+                entry = None
+            if entry is None or kind not in entry["data"]:
+                self._misses += 1
+                return False, None
+            entries.move_to_end(path)
+            self._hits += 1
+            return True, entry["data"][kind]
+
+    def put(self, file_path: str, kind: str, value):
+        path, signature = self._signature(file_path)
+        if signature is None:
+            return  # Missing file, nothing to key on
+        with self._lock:
+            entries = self._loaded()
+            entry = entries.get(path)
+            if entry is None or entry["signature"] != signature:
+                entry = {"signature": signature, "data": {}}
+                entries[path] = entry
+            entry["data"][kind] = value
+            entries.move_to_end(path)
+            while len(entries) > self._max_entries:
+                entries.popitem(last=False)
+            self._dirty = True
+
+    def invalidate(self, file_path: str):
+        # For writers: mtime granularity can hide a same-size rewrite
+        path = os.path.abspath(file_path)
+        with self._lock:
+            if self._loaded().pop(path, None) is not None:
+                self._dirty = True
+
+    def save(self):
+        if not self._cache_path:
+            return
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            data = dict(self._entries)
+            self._dirty = False
+
+        temp_path = self._cache_path.with_suffix(".tmp")
+        try:
+            self._cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self._cache_path)
+        except (OSError, TypeError, ValueError):
+            pass  # Only a cache
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total, 3) if total else 0.0,
+                "entries": len(self._loaded()),
+            }
+
+    # Private Methods
+    def _signature(self, file_path: str) -> tuple[str, list | None]:
+        path = os.path.abspath(file_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return path, None
+        return path, [stat.st_size, stat.st_mtime_ns]  # A list so it compares equal after a JSON round trip
+
+    def _loaded(self) -> OrderedDict:
+        if self._entries is not None:
+            return self._entries
+
+        self._entries = OrderedDict()
+        if self._cache_path and self._cache_path.exists():
+            try:
+                with open(self._cache_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                for path, entry in data.items():
+                    if isinstance(entry, dict) and "signature" in entry and "data" in entry:
+                        self._entries[path] = entry
+            except (OSError, ValueError):
+                pass
+        return self._entries
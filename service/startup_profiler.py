@@ -0,0 +1,27 @@
+import time
+
+
+class StartupProfiler:
+    def __init__(self, enabled: bool = False, started_at: float = None):
+        self._enabled = enabled
+        self._started_at = started_at if started_at is not None else time.perf_counter()
+        self._last = self._started_at
+        self._phases: list[tuple[str, float]] = []
+
+    # Public Methods
+    def mark(self, phase: str, at: float = None):
+        # Records the time spent since the previous mark under `phase`
+        if not self._enabled:
+            return
+        now = at if at is not None else time.perf_counter()
+        self._phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self) -> str:
+        lines = [f"  {phase:<24}{seconds * 1000:8.1f} ms" for phase, seconds in self._phases]
+        lines.append(f"  {'total':<24}{(self._last - self._started_at) * 1000:8.1f} ms")
+        return "Startup profile:\n" + "\n".join(lines)
+
+    def print_report(self):
+        if self._enabled:
+            print(self.report(), flush=True)
@@ -0,0 +1,212 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from pathlib import Path
+from typing import Callable
+from contextlib import contextmanager
+from collections import OrderedDict
+
+from model.video_id import VideoIdParser
+from service.file_finalizer import link_or_clone, open_locked
+
+DEFAULT_MAX_BYTES = 5 * 1024 ** 3
+
+
+class StreamCacheService:
+    # Raw streams exactly as yt-dlp downloaded them, keyed by video and format_id, so
+    # another mode or quality of the same video reuses them. Files are shared with the
+    # output folder through hard links (or reflinks); everything downstream replaces
+    # files instead of editing them, so a cached stream is never modified.
+    # The GUI and CLI may share the folder, so every change re-reads index.json under
+    # index.lock and writes it back, instead of saving one process's view over another's.
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self._cache_dir = Path(cache_dir)
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        self._index_path = self._cache_dir / "index.json"
+        self._lock_path = self._cache_dir / "index.lock"
+        self._max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, dict] = OrderedDict()  # Least recently used first
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._bytes_served = 0
+
+        with self._shared_index():
+            self._remove_unindexed()
+            self._evict()  # The budget may have shrunk since the last run
+
+    # Public Methods
+    @staticmethod
+    def make_key(video_key: str | None, format_id: str | None) -> str | None:
+        if not video_key or not format_id:
+            return None
+        return f"{video_key} {format_id}"
+
+    def fetch(self, key: str | None, target: str | Path) -> bool:
+        # Places the cached stream at target; False on a miss
+        if not key:
+            return False
+        with self._shared_index():
+            entry = self._entries.get(key)
+            cached = self._cache_dir / entry["file"] if entry else None
+            if cached is None or not self._is_intact(cached, entry):
+                if entry:
+                    self._remove(key)
+                self._misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self._hits += 1
+            self._bytes_served += entry["size"]
+
+        try:
+            link_or_clone(cached, Path(target))
+        except OSError:
+            Path(target).unlink(missing_ok=True)
+            return False
+        return True
+
+    def store(self, key: str | None, source: str | Path):
+        # Adds a finished download; cheap when source and cache share a file system
+        source = Path(source)
+        if not key or self._max_bytes <= 0 or not source.is_file():
+            return
+        size = source.stat().st_size
+        if size > self._max_bytes:
+            return
+
+        file_name = hashlib.sha1(key.encode("utf-8")).hexdigest() + source.suffix
+        cached = self._cache_dir / file_name
+        with self._shared_index():
+            if key in self._entries and cached.exists() and os.path.samefile(cached, source):
+                self._entries.move_to_end(key)
+                return
+
+        # Two jobs (or processes) may store at once; the copy fallback can be slow, so it runs unlocked
+        temp = cached.with_name(f"{cached.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            temp.unlink(missing_ok=True)
+            link_or_clone(source, temp)
+        except OSError:
+            temp.unlink(missing_ok=True)
+            return
+
+        with self._shared_index():
+            # Renamed under the lock, so no other process sees a stream file the index doesn't list
+            try:
+                os.replace(temp, cached)
+            except OSError:
+                temp.unlink(missing_ok=True)
+                return
+            self._entries.pop(key, None)
+            self._entries[key] = {"file": file_name, "size": size, "stored": time.time()}
+            self._evict()
+
+    def wrap_download(self, download: Callable) -> Callable:
+        # Wraps YoutubeDL.dl. A cached stream is linked to the exact path yt-dlp is about to
+        # write; yt-dlp then takes its "already downloaded" path (continuedl) and fires the
+        # usual finished hook. Only real downloads are added to the cache afterwards; storing a
+        # hit again would copy the whole stream back where links don't work.
+        def dl(name, info, subtitle=False, test=False):
+            key = None
+            if not (subtitle or test or name == "-" or info.get("requested_formats")):
+                key = self.make_key(VideoIdParser.from_info(info), info.get("format_id"))
+            if key and not os.path.exists(name):
+                self.fetch(key, name)
+
+            result = download(name, info, subtitle=subtitle, test=test)
+            if key and result and result[0] and result[1]:  # (success, real_download)
+                self.store(key, name)
+            return result
+        return dl
+
+    def clear(self):
+        with self._shared_index():
+            for key in list(self._entries):
+                self._remove(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / lookups) if lookups else 0.0,
+                "bytes_served": self._bytes_served,
+                "evictions": self._evictions,
+                "entries": len(self._entries),
+                "bytes": sum(e["size"] for e in self._entries.values()),
+                "max_bytes": self._max_bytes,
+            }
+
+    # Private Methods
+    @contextmanager
+    def _shared_index(self):
+        # Yields with self._entries freshly read from disk; writes them back if the block finishes
+        with self._lock:
+            lock = open_locked(self._lock_path, wait=True)  # None: unlockable folder, go on without
+            try:
+                self._load_index()
+                yield
+                self._save_index()
+            finally:
+                if lock:
+                    lock.close()
+
+    def _is_intact(self, cached: Path, entry: dict) -> bool:
+        # A hard-linked output edited in place by another program would change the cached copy too
+        try:
+            return cached.stat().st_size == entry["size"]
+        except OSError:
+            return False
+
+    def _evict(self):
+        total = sum(e["size"] for e in self._entries.values())
+        while self._entries and total > self._max_bytes:
+            key, entry = next(iter(self._entries.items()))
+            total -= entry["size"]
+            self._remove(key)
+            self._evictions += 1
+
+    def _remove(self, key: str):
+        # Output files linked to this entry keep their data; only the cache's name goes
+        entry = self._entries.pop(key, None)
+        if entry:
+            try:
+                os.remove(self._cache_dir / entry["file"])
+            except OSError:
+                pass
+
+    def _load_index(self):
+        try:
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = {}
+
+        self._entries = OrderedDict(
+            (key, entry) for key, entry in index.get("entries", [])
+            if (self._cache_dir / entry["file"]).exists()
+        )
+
+    def _remove_unindexed(self):
+        # Streams a crash left out of the index (or temps of an interrupted store) would
+        # never be evicted, so the folder would outgrow max_bytes
+        known = {entry["file"] for entry in self._entries.values()} | {self._index_path.name, self._lock_path.name}
+        for path in self._cache_dir.iterdir():
+            if path.name in known or not path.is_file():
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def _save_index(self):
+        temp_path = self._index_path.with_suffix(".json.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": list(self._entries.items())}, f)
+        os.replace(temp_path, self._index_path)
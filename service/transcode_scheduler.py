@@ -0,0 +1,112 @@
+import os
+import threading
+from typing import Callable
+
+CPU = "CPU"
+WAIT_POLL_SECONDS = 0.5  # How often a waiting job re-checks its cancel flag
+
+# Concurrent sessions per encoder type. Consumer NVIDIA cards cap NVENC sessions
+# in the driver; QSV/AMF slow down sharply past a couple of sessions.
+DEFAULT_SESSION_LIMITS = {
+    "NVENC": 3,
+    "QSV": 2,
+    "AMF": 2,
+    CPU: max(1, (os.cpu_count() or 2) // 4),  # Each slot is a share of the cores, see _cpu_threads
+}
+
+
+class TranscodeScheduler:
+    # Hands each transcode a session slot on an encoder type. When the requested
+    # hardware encoder is full the job spills to a free CPU slot instead of waiting.
+    # CPU slots split the cores between jobs: a transcode that will be encoded in
+    # segments takes every free CPU slot, and libx264 gets the threads its slots cover.
+    # backend: anything with VideoProcessingService's transcode() and uses_segments().
+    def __init__(self, backend, limits: dict[str, int] = None, cores: int = None):
+        self._backend = backend
+        self._limits = dict(DEFAULT_SESSION_LIMITS, **(limits or {}))
+        self._cores = cores or os.cpu_count() or 2
+        self._available: set[str] | None = None  # None until encoder detection reports
+        self._active = {encoder_type: 0 for encoder_type in self._limits}
+        self._waiting = 0
+        self._spilled = 0
+        self._condition = threading.Condition()
+
+    # Public Methods
+    def set_available_encoders(self, encoders: list[dict]):
+        # Same list EncoderTestService reports: [{'encoder': ..., 'name': ..., 'type': 'NVENC'}, ...]
+        with self._condition:
+            self._available = {info["type"] for info in encoders} | {CPU}
+            self._condition.notify_all()
+
+    def max_concurrency(self) -> int:
+        return sum(self._limits.values())
+
+    def transcode(self, input_file: str, encoder: str, progress_callback: Callable = None,
+                  is_cancelled: Callable = None, duration: float = None,
+                  on_assigned: Callable = None) -> str:
+        # Blocks until a slot is free, then runs the backend; returns the encoder type used
+        encoder_type, slots = self._acquire(encoder, is_cancelled, duration)
+        try:
+            if on_assigned:
+                on_assigned(encoder_type)
+            self._backend.transcode(input_file, encoder_type, progress_callback=progress_callback,
+                                    is_cancelled=is_cancelled, duration=duration,
+                                    threads=self._cpu_threads(slots) if encoder_type == CPU else None)
+        finally:
+            self._release(encoder_type, slots)
+        return encoder_type
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {
+                "active": dict(self._active),
+                "limits": dict(self._limits),
+                "waiting": self._waiting,
+                "spilled_to_cpu": self._spilled,
+            }
+
+    # Private Methods
+    def _acquire(self, encoder: str, is_cancelled: Callable = None, duration: float = None) -> tuple[str, int]:
+        # Returns the encoder type and how many of its slots the job holds
+        with self._condition:
+            self._waiting += 1
+            try:
+                while True:
+                    if is_cancelled and is_cancelled():
+                        raise Exception("Transcode cancelled by user")
+
+                    encoder_type = self._pick_slot(encoder)
+                    if encoder_type:
+                        slots = 1
+                        if encoder_type == CPU:
+                            # Segments run in parallel, so such a job gets every free CPU slot
+                            free = self._limits[CPU] - self._active[CPU]
+                            if self._backend.uses_segments(CPU, duration, self._cpu_threads(free)):
+                                slots = free
+                        self._active[encoder_type] += slots
+                        if encoder_type != encoder:
+                            self._spilled += 1
+                        return encoder_type, slots
+                    self._condition.wait(timeout=WAIT_POLL_SECONDS)
+            finally:
+                self._waiting -= 1
+
+    def _pick_slot(self, encoder: str) -> str | None:
+        if encoder not in self._limits or (self._available is not None and encoder not in self._available):
+            encoder = CPU  # Not detected on this machine
+        if self._has_free_slot(encoder):
+            return encoder
+        if encoder != CPU and self._has_free_slot(CPU):
+            return CPU
+        return None
+
+    def _has_free_slot(self, encoder_type: str) -> bool:
+        return self._active[encoder_type] < self._limits[encoder_type]
+
+    def _cpu_threads(self, slots: int) -> int:
+        return max(1, self._cores * slots // self._limits[CPU])
+
+    def _release(self, encoder_type: str, slots: int = 1):
+        with self._condition:
+            self._active[encoder_type] -= slots
+            self._condition.notify_all()
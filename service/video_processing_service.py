@@ -1,87 +1,329 @@
+import os
+import csv
 import json
-import shutil
-import subprocess
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable
+
+from model.mp4_inspector import Mp4Inspector
+from service.file_finalizer import FileFinalizer
+from service.media_tool_runner import MediaToolRunner
+from service.probe_cache_service import ProbeCacheService
+
+PROBE_TIMEOUT = 30
+DEFAULT_SEGMENT_THRESHOLD_SECONDS = 10 * 60  # CPU transcodes of longer videos are split across cores
+MIN_SEGMENT_SECONDS = 20
 
-si = subprocess.STARTUPINFO()
-si.dwFlags |= subprocess.STARTF_USESHOWWINDOW
 class VideoProcessingService:
-    def __init__(self, ffmpeg_dir: Path, encoder: str = 'QSV'):   
+    def __init__(self, ffmpeg_dir: Path, encoder: str = 'QSV', probe_cache: ProbeCacheService = None,
+                 segment_threshold: float = DEFAULT_SEGMENT_THRESHOLD_SECONDS, runner: MediaToolRunner = None,
+                 finalizer: FileFinalizer = None):
         self._ffmpeg_dir = ffmpeg_dir
-        self._ffprobe_path = self._ffmpeg_dir / 'ffprobe.exe'
+        self._runner = runner or MediaToolRunner(ffmpeg_dir)
+        self._segment_threshold = segment_threshold  # 0/None disables segmenting
         self._encoder = encoder # "qsv", "nvenc", "cpu", "amf"
+        self._inspector = Mp4Inspector()
+        self._probe_cache = probe_cache or ProbeCacheService()
+        self._finalizer = finalizer or FileFinalizer()
+
+    def transcode(self, input_file: str, encoder: str, progress_callback: Callable = None,
+                  is_cancelled: Callable = None, duration: float = None, threads: int = None) -> None:
+        # progress_callback(percent, fps, eta_seconds) is called from a reader thread;
+        # percent and eta are None when the duration is unknown.
+        # threads: cores a CPU transcode may use (the scheduler's share); None means all of them
+        # The encoder is passed down rather than stored: the scheduler runs several at once
+        encoder = encoder or self._encoder
 
-    def transcode(self, input_file: str, encoder: str) -> None:
-        self._encoder = encoder
-        
         try:
-            if self._is_h264_video(input_file):
+            probe_data = self._probe_or_none(input_file)
+            if self._is_h264_video(probe_data):
                 return
             
-            encoder_args = self._build_video_encoder_args()
-            self._transcode_with_encoder(input_file, encoder_args)
+            encoder_args = self.build_video_encoder_args(encoder)
+            duration = duration or self._stream_duration(probe_data)
+            segmented = self.uses_segments(encoder, duration, threads)
+            if encoder == 'CPU' and threads and not segmented:
+                encoder_args = [*encoder_args, '-threads', str(threads)]
+            self._transcode_with_encoder(input_file, encoder_args, duration, progress_callback, is_cancelled,
+                                         segmented=segmented, cores=threads)
 
         except Exception as e:
             raise Exception(f"Transcoding Failed: {e}")
 
-    def _is_h264_video(self, input_file: str) -> bool:
+    def _probe_or_none(self, input_file: str) -> dict | None:
+        try:
+            return self._probe_video_stream(input_file)
+        except Exception:
+            return None
+
+    def uses_segments(self, encoder: str, duration: float = None, threads: int = None) -> bool:
+        # Hardware encoders are limited by their engine, not by cores
+        return bool(
+            encoder == 'CPU'
+            and self._segment_threshold
+            and duration
+            and duration >= self._segment_threshold
+            and (threads or os.cpu_count() or 1) >= 4
+        )
+
+    def _is_h264_video(self, probe_data: dict | None) -> bool:
         try:
-            probe_data = self._probe_video_stream(input_file)
             codec = probe_data['streams'][0].get('codec_name', '')
             return codec == 'h264'
         except:
             return False # Assumes needs transcoding on error
+
+    def _stream_duration(self, probe_data: dict | None) -> float | None:
+        try:
+            return float(probe_data['streams'][0]['duration']) or None
+        except (TypeError, KeyError, IndexError, ValueError):
+            return None
         
-    def _transcode_with_encoder(self, input_file: str, encoder_args: list) -> None:
+    def _transcode_with_encoder(self, input_file: str, encoder_args: list, duration: float = None,
+                                progress_callback: Callable = None, is_cancelled: Callable = None,
+                                segmented: bool = False, cores: int = None) -> None:
         input_path = Path(input_file)
-        temp_output = input_path.with_stem(f"{input_path.stem}_temp")
+        # ffmpeg writes straight into a same-folder temp that is then renamed over the
+        # original: no bytes are copied and the original stays intact until the rename
+        temp_output = self._finalizer.temp_path_for(input_path)
+
+        try:
+            if segmented:
+                self._transcode_in_segments(input_path, temp_output, encoder_args, duration,
+                                            progress_callback, is_cancelled, cores)
+            else:
+                cmd = [
+                    "-y",
+                    "-nostats",
+                    "-loglevel", "error",
+                    "-progress", "pipe:1",
+                    "-i", str(input_path),
+                    "-map", "0:v:0",
+                    "-map", "0:a:0?",
+                    *encoder_args,
+                    '-c:a', 'copy',
+                    "-movflags", "+faststart",
+                    str(temp_output),
+                ]
+                self._run_ffmpeg(cmd, duration, progress_callback, is_cancelled)
+        except BaseException:
+            self._finalizer.discard(temp_output)
+            raise
+
+        self._finalizer.finalize(temp_output, input_path)
+        self._probe_cache.invalidate(str(input_path))
 
+    def _transcode_in_segments(self, input_path: Path, output_path: Path, encoder_args: list,
+                               duration: float, progress_callback: Callable = None,
+                               is_cancelled: Callable = None, cores: int = None):
+        # Split the video stream at keyframes (stream copy), encode the pieces in
+        # parallel, then join them with the concat demuxer and copy the original audio.
+        # Processes times threads stay within the cores this transcode was given.
+        cores = cores or os.cpu_count() or 4
+        workers = max(2, cores // 2)
+        segment_seconds = max(MIN_SEGMENT_SECONDS, duration / (workers * 2))  # Extra pieces balance the load
+        encoder_args = [*encoder_args, '-threads', str(max(1, cores // workers))]
+
+        work_dir = self._finalizer.temp_dir_for(input_path)
+        try:
+            segments = self._split_at_keyframes(input_path, work_dir, segment_seconds, is_cancelled)
+            encoded = self._encode_segments(segments, work_dir, encoder_args, workers, duration,
+                                            progress_callback, is_cancelled)
+            self._concat_segments(encoded, input_path, output_path, work_dir, is_cancelled)
+        finally:
+            self._finalizer.discard(work_dir)
+
+        if progress_callback:
+            progress_callback(100, 0.0, 0)
+
+    def _split_at_keyframes(self, input_path: Path, work_dir: Path, segment_seconds: float,
+                            is_cancelled: Callable = None) -> list[tuple[Path, float]]:
+        segment_list = work_dir / "segments.csv"
         cmd = [
-            str(self._ffmpeg_dir / "ffmpeg.exe"),
-            "-y",
+            "-y", "-nostats", "-loglevel", "error",
             "-i", str(input_path),
             "-map", "0:v:0",
-            "-map", "0:a:0?",
-            *encoder_args,           
-            '-c:a', 'copy',
-            "-movflags", "+faststart",
-            str(temp_output),
+            "-c", "copy",
+            "-f", "segment",
+            "-segment_time", f"{segment_seconds:.3f}",
+            "-segment_list", str(segment_list),
+            "-segment_list_type", "csv",
+            "-reset_timestamps", "1",
+            str(work_dir / "source_%04d.mkv"),
         ]
+        self._run_ffmpeg(cmd, is_cancelled=is_cancelled)
 
-        result = subprocess.run(cmd, capture_output=True, startupinfo=si)
+        # csv rows: file name, start time, end time
+        with open(segment_list, "r", encoding="utf-8", newline="") as f:
+            return [(work_dir / row[0], float(row[2]) - float(row[1])) for row in csv.reader(f) if row]
 
-        if result.returncode != 0:
-            temp_output.unlink(missing_ok=True)
-            raise Exception(f"FFmpeg error: {result.stderr}")
+    def _encode_segments(self, segments: list[tuple[Path, float]], work_dir: Path, encoder_args: list,
+                         workers: int, duration: float, progress_callback: Callable = None,
+                         is_cancelled: Callable = None) -> list[Path]:
+        lock = threading.Lock()
+        encoded_seconds = [0.0] * len(segments)
+        segment_fps = [0.0] * len(segments)
+        started_at = time.monotonic()
+        failed = threading.Event()
+        errors: list[Exception] = []  # The failure that stopped the others; theirs only say "cancelled"
+
+        def should_stop() -> bool:
+            return failed.is_set() or bool(is_cancelled and is_cancelled())
+
+        def report(index: int, segment_duration: float, percent: int | None, fps: float):
+            with lock:
+                encoded_seconds[index] = segment_duration * (percent or 0) / 100
+                segment_fps[index] = fps if percent != 100 else 0.0
+                done = min(1.0, sum(encoded_seconds) / duration)
+                total_fps = sum(segment_fps)
+            if not progress_callback:
+                return
+            elapsed = time.monotonic() - started_at
+            eta = elapsed * (1 - done) / done if done > 0 else None
+            progress_callback(min(99, int(done * 100)), total_fps, eta)
+
+        def encode(index: int) -> Path:
+            source, segment_duration = segments[index]
+            if should_stop():
+                raise Exception("Transcode cancelled by user")
+            output = work_dir / f"encoded_{index:04d}.mp4"
+            cmd = [
+                "-y", "-nostats", "-loglevel", "error",
+                "-progress", "pipe:1",
+                "-i", str(source),
+                "-map", "0:v:0",
+                *encoder_args,
+                "-an",
+                str(output),
+            ]
+            try:
+                self._run_ffmpeg(cmd, segment_duration,
+                                 lambda percent, fps, eta: report(index, segment_duration, percent, fps),
+                                 should_stop)
+            except Exception as e:
+                with lock:
+                    if not failed.is_set():
+                        errors.append(e)
+                    failed.set()  # Stop the other segments early
+                raise
+            return output
 
-        input_path.unlink()
-        shutil.move(str(temp_output), str(input_path))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(encode, index) for index in range(len(segments))]
+
+        # Every segment has stopped by now, so the first real error is known
+        if is_cancelled and is_cancelled():
+            raise Exception("Transcode cancelled by user")
+        if errors:
+            raise errors[0]
+        return [future.result() for future in futures]
+
+    def _concat_segments(self, encoded: list[Path], input_path: Path, output_path: Path, work_dir: Path,
+                         is_cancelled: Callable = None):
+        concat_list = work_dir / "concat.txt"
+        with open(concat_list, "w", encoding="utf-8") as f:
+            for segment in encoded:
+                escaped = str(segment).replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        cmd = [
+            "-y", "-nostats", "-loglevel", "error",
+            "-f", "concat", "-safe", "0", "-i", str(concat_list),
+            "-i", str(input_path),
+            "-map", "0:v:0",
+            "-map", "1:a:0?",
+            "-c", "copy",
+            "-movflags", "+faststart",
+            str(output_path),
+        ]
+        self._run_ffmpeg(cmd, is_cancelled=is_cancelled)
         
+    def _run_ffmpeg(self, args: list, duration: float = None, progress_callback: Callable = None,
+                    is_cancelled: Callable = None) -> None:
+        parser = self._make_progress_parser(duration, progress_callback)
+        result = self._runner.run("ffmpeg", args, on_stdout_line=parser, is_cancelled=is_cancelled)
+
+        if result.cancelled:
+            raise Exception("Transcode cancelled by user")
+        if result.returncode != 0:
+            raise Exception(f"FFmpeg error: {result.stderr_text}")
+
+    def _make_progress_parser(self, duration: float = None, progress_callback: Callable = None) -> Callable:
+        # `-progress` writes key=value blocks, each closed by a progress=continue/end line
+        block = {}
+
+        def on_line(raw: bytes):
+            key, _, value = raw.decode(errors="replace").strip().partition("=")
+            block[key] = value
+            if key != "progress":
+                return
+            if progress_callback:
+                progress_callback(*self._parse_progress(block, duration))
+            block.clear()
+        return on_line
+
+    def _parse_progress(self, block: dict, duration: float = None) -> tuple:
+        try:
+            fps = float(block.get("fps", 0))
+        except ValueError:
+            fps = 0.0
+        try:
+            speed = float(block.get("speed", "").rstrip("x"))
+        except ValueError:
+            speed = 0.0
+        try:
+            position = int(block.get("out_time_us") or block.get("out_time_ms") or 0) / 1_000_000
+        except ValueError:
+            position = 0.0
+
+        if block.get("progress") == "end":
+            return 100, fps, 0
+        if not duration:
+            return None, fps, None
+
+        percent = max(0, min(99, int(position / duration * 100)))
+        eta = (duration - position) / speed if speed > 0 else None
+        return percent, fps, eta
+
     def _probe_video_stream(self, input_file: str) -> dict:
+        # Failed probes raise and are not cached, so a retry probes again
+        return self._probe_cache.get_or_compute(input_file, "video_stream", self._probe_uncached)
+
+    def _probe_uncached(self, input_file: str) -> dict:
+        # Reading the moov box in-process is much cheaper than spawning ffprobe
+        stream = self._inspector.probe_video_stream(input_file)
+        if stream is not None:
+            return {'streams': [stream]}
+        return self._ffprobe_video_stream(input_file)
+
+    def _ffprobe_video_stream(self, input_file: str) -> dict:
         cmd = self._build_probe_cmd(input_file)
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, startupinfo=si)
+        result = self._runner.run("ffprobe", cmd, timeout=PROBE_TIMEOUT)
        
-        if result.returncode != 0:
+        if not result.ok:
             raise RuntimeError("Probe failed")
        
         return json.loads(result.stdout)
    
     def _build_probe_cmd(self, input_file: str) -> list:
         return [
-            str(self._ffprobe_path),
             '-v', 'error',
             '-select_streams', 'v:0',
-            '-show_entries', 'stream=codec_name,width,height,bit_rate,avg_frame_rate',
+            '-show_entries', 'stream=codec_name,width,height,bit_rate,avg_frame_rate,duration',
             '-of', 'json',
             input_file
         ]
 
-    def _build_video_encoder_args(self) -> list:
-        if self._encoder == 'QSV': # Intel QSV
+    @staticmethod
+    def build_video_encoder_args(encoder: str) -> list:
+        # Also used by the encoder benchmark, so measured speed matches real transcodes
+        if encoder == 'QSV': # Intel QSV
             return ['-c:v', 'h264_qsv', '-preset', 'fast', '-global_quality', '18']
-        elif self._encoder == 'NVENC': # NVIDIA GPU
+        elif encoder == 'NVENC': # NVIDIA GPU
             return ['-c:v', 'h264_nvenc', '-preset', 'fast', '-cq', '18']
-        elif self._encoder == 'AMF': # AMD AMF
+        elif encoder == 'AMF': # AMD AMF
             return [
                 '-c:v', 'h264_amf',
                 '-quality', 'balanced',
@@ -0,0 +1,60 @@
+import queue
+import threading
+from typing import Callable
+
+
+class WorkerPool:
+    def __init__(self, handler: Callable, max_workers: int = 3, name: str = "worker"):
+        self._handler = handler
+        self._max_workers = max(1, int(max_workers))
+        self._name = name
+
+        self._queue = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._active = 0
+
+    # Public Methods
+    def submit(self, item):
+        self._queue.put(item)
+        self._ensure_workers()
+
+    def pending_count(self) -> int:
+        return self._queue.qsize()
+
+    def active_count(self) -> int:
+        with self._lock:
+            return self._active
+
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def wait(self):
+        self._queue.join()
+
+    # Private Methods
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self._max_workers:
+                thread = threading.Thread(
+                    target=self._worker_loop,
+                    name=f"{self._name}-{len(self._threads) + 1}",
+                    daemon=True,
+                )
+                self._threads.append(thread)
+                thread.start()
+
+    def _worker_loop(self):
+        while True:
+            item = self._queue.get()
+            with self._lock:
+                self._active += 1
+            try:
+                self._handler(item)
+            except Exception:
+                pass  # Handlers report their own errors
+            finally:
+                with self._lock:
+                    self._active -= 1
+                self._queue.task_done()
@@ -1,14 +1,27 @@
 import tkinter as tk
 from tkinter import ttk
+from typing import Callable
 from abc import ABC, abstractmethod
 
+from view.ui_dispatcher import UiDispatcher
+
 class BaseView(ttk.Frame, ABC):
     def __init__(self, parent: tk.Widget):
         super().__init__(parent)
+        self._dispatcher: UiDispatcher = None
 
         self._setup_style()
         self._create_widgets()
 
+    def set_dispatcher(self, dispatcher: UiDispatcher):
+        self._dispatcher = dispatcher
+
+    def _dispatched(self, callback: Callable, coalesce: bool = True) -> Callable:
+        # Callbacks handed to controllers may run on worker threads
+        if self._dispatcher is None:
+            return callback
+        return self._dispatcher.wrap(callback, coalesce=coalesce)
+
     @abstractmethod
     def _setup_style(self):
         pass
@@ -13,6 +13,8 @@ class CustomComboBox:
     
         self._AUDIO_QUALITIES = ["128 kbps", "192 kbps", "256 kbps", "320 kbps"]
         self._VIDEO_QUALITIES = ["360p", "480p", "720p", "1080p", "2K", "4K"]
+        self._PASSTHROUGH_QUALITIES = ["Original"]  # m4a/opus keep the source bitrate
+        self._labels: dict[str, str] = {}  # Shown label -> quality value, once real formats are known
         
     def make_combobox(self):
         self.combobox = ttk.Combobox(self._parent, 
@@ -23,7 +25,33 @@ class CustomComboBox:
                                     )
         self.combobox.place(x=self._posx, y=self._posy)
 
+    def get_choices(self, mode) -> list[str]:
+        if mode == "mp4":
+            return list(self._VIDEO_QUALITIES)
+        if mode == "mp3":
+            return list(self._AUDIO_QUALITIES)
+        return list(self._PASSTHROUGH_QUALITIES)
+
+    def set_options(self, mode, options: list[tuple[str, str]]):
+        # [(value, label)] for what the current video offers; [] restores the fixed choices
+        if not options:
+            current = self.get_value()
+            self.switch_mode(mode)
+            self.set_value(current)
+            return
+
+        choices = self.get_choices(mode)
+        current = self.get_value()
+        self._labels = {label: value for value, label in options}
+        self.combobox['values'] = [label for _, label in options]
+
+        # Keep the selection, or move to the nearest quality the video has
+        position = choices.index(current) if current in choices else 0
+        value, label = min(options, key=lambda o: abs(choices.index(o[0]) - position))
+        self._var.set(label)
+
     def switch_mode(self, mode):
+        self._labels = {}
         if mode == "mp3":
             self.combobox['values'] = self._AUDIO_QUALITIES
             self.set_value(self._AUDIO_QUALITIES[0])
@@ -32,6 +60,10 @@ class CustomComboBox:
             self.combobox['values'] = self._VIDEO_QUALITIES
             self.set_value(self._VIDEO_QUALITIES[0])
 
+        if mode in ("m4a", "opus"):
+            self.combobox['values'] = self._PASSTHROUGH_QUALITIES
+            self.set_value(self._PASSTHROUGH_QUALITIES[0])
+
     def set_value(self, value):
         options = self.combobox['values']
         if value not in options:
@@ -39,4 +71,5 @@ class CustomComboBox:
         self._var.set(value)
 
     def get_value(self):
-        return self._var.get()
\ No newline at end of file
+        label = self._var.get()
+        return self._labels.get(label, label)
\ No newline at end of file
@@ -8,13 +8,15 @@ class CustomEntry:
         self._posx = posx
         self._posy = posy
         self._entry = None
+        self._var = None
 
         # Placeholder functionality can be implemented if needed
         self._placeholder = placeholder
         self._has_placeholder = False
 
     def make_entry(self):
-        self._entry = ttk.Entry(self._parent, width=self._width)
+        self._var = tk.StringVar()
+        self._entry = ttk.Entry(self._parent, width=self._width, textvariable=self._var)
         self._entry.place(x=self._posx, y=self._posy)
 
         if self._placeholder:
@@ -42,6 +44,10 @@ class CustomEntry:
             return ""
         return self._entry.get().strip()
     
+    def set_on_change(self, callback):
+        # callback(text) on every edit, typed or pasted; placeholder swaps report ""
+        self._var.trace_add("write", lambda *_: callback(self.get_entry_text()))
+
     def hide_entry(self):
         self._entry.place_forget()
 
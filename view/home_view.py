@@ -13,6 +13,11 @@ from controller.download_controller import DownloadController
 class Mode:
     MP3 = 1
     MP4 = 2
+    M4A = 3
+    OPUS = 4
+
+MODE_NAMES = {Mode.MP3: "mp3", Mode.MP4: "mp4", Mode.M4A: "m4a", Mode.OPUS: "opus"}
+PREVIEW_DELAY_MS = 400  # Wait for typing/pasting to settle before extracting
 
 class HomeView(BaseView):
     def __init__(self, parent: tk.Widget):
@@ -35,6 +40,7 @@ class HomeView(BaseView):
         self._show_metadata: Callable = None
         self._on_cancel: Callable = None
         self._video_encoder: str = "CPU"
+        self._preview_after_id = None
 
         super().__init__(parent)
 
@@ -80,10 +86,7 @@ class HomeView(BaseView):
             data,
             path,
             self._video_encoder,
-            self.set_download_enabled,
-            self.set_cancel_enabled,
-            self.update_progress,
-            self.update_status
+            *self._download_callbacks()
         )
 
     def _on_metadata_clicked(self):
@@ -94,13 +97,27 @@ class HomeView(BaseView):
         self._folder_controller.browse_folder()
 
     def _on_mode_change(self):
-        mode = "mp3" if self._mode_var.get() == Mode.MP3 else "mp4"
-        self._quality_selector.switch_mode(mode)
+        self._quality_selector.switch_mode(MODE_NAMES[self._mode_var.get()])
+        self._schedule_preview()  # Re-reads the cached extraction for the new mode
+
+    def _on_url_changed(self, text: str):
+        self._schedule_preview()
+
+    def _on_quality_options(self, mode: str, options: list[tuple[str, str]]):
+        if mode != MODE_NAMES[self._mode_var.get()]:
+            return  # The user switched modes while this was extracting
+        self._quality_selector.set_options(mode, options)
 
     def _on_cancel_clicked(self):
         if self._on_cancel:
             self._on_cancel()
 
+    def _on_resume_clicked(self):
+        self._download_controller.resume_requested(*self._download_callbacks())
+
+    def _on_discard_clicked(self):
+        self._download_controller.discard_download()
+
     def _on_reset_clicked(self):
         if self._url_entry:
             self._url_entry.set_entry_text("")
@@ -110,6 +127,7 @@ class HomeView(BaseView):
             self._album_entry.set_entry_text("")
 
         self._mode_var.set(Mode.MP3)
+        self._on_mode_change()
         self.update_progress(0)
         self.update_status("Ready")
 
@@ -134,13 +152,15 @@ class HomeView(BaseView):
 
         self._title = self._create_header()
         self._url_entry = self._create_url_input()
+        self._url_entry.set_on_change(self._on_url_changed)
         self._base_folder_entry, self._browse_button = self._create_base_folder_input()
         self._subfolder_entry = self._create_subfolder_input()
-        self._mp3_radio, self._mp4_radio = self._create_mode_section()
+        self._mp3_radio, self._mp4_radio, self._m4a_radio, self._opus_radio = self._create_mode_section()
         self._quality_selector = self._create_quality_section()
         self._metadata_frame, self._artist_entry, self._album_entry = self._create_metadata_section()
         self._progress_bar, self._status_entry = self._create_progress_section()
-        self._download_button, self._metadata_button, self._cancel_button, self._reset_button = self._create_action_buttons()
+        (self._download_button, self._metadata_button, self._cancel_button, self._reset_button,
+         self._resume_button, self._discard_button) = self._create_action_buttons()
 
         self.set_cancel_enabled(False)
         self.update_status("Ready")
@@ -226,10 +246,31 @@ class HomeView(BaseView):
             activebackground=self._theme.get_background_color(),
             command=lambda: self._on_mode_change()
         )
+        # Passthrough audio: the source stream is only remuxed, no re-encode
+        mode_button_m4a = tk.Radiobutton(
+            self,
+            text="M4a",
+            variable=self._mode_var,
+            value=Mode.M4A,
+            bg=self._theme.get_background_color(),
+            activebackground=self._theme.get_background_color(),
+            command=lambda: self._on_mode_change()
+        )
+        mode_button_opus = tk.Radiobutton(
+            self,
+            text="Opus",
+            variable=self._mode_var,
+            value=Mode.OPUS,
+            bg=self._theme.get_background_color(),
+            activebackground=self._theme.get_background_color(),
+            command=lambda: self._on_mode_change()
+        )
         mode_button_mp3.place(x=30, y=197)
         mode_button_mp4.place(x=100, y=197)
+        mode_button_m4a.place(x=170, y=197)
+        mode_button_opus.place(x=225, y=197)
 
-        return mode_button_mp3, mode_button_mp4
+        return mode_button_mp3, mode_button_mp4, mode_button_m4a, mode_button_opus
 
     def _create_quality_section(self):
         label = ttk.Label(
@@ -308,7 +349,38 @@ class HomeView(BaseView):
                                     )
         metadata_button.place(x=213, y=560)
 
-        return download_button, metadata_button, cancel_button, reset_button
+        resume_button = ttk.Button(self, text="Resume", width=20, command=lambda: self._on_resume_clicked())
+        resume_button.place(x=60, y=560)
+
+        discard_button = ttk.Button(self, text="Discard Partial", width=20, command=lambda: self._on_discard_clicked())
+        discard_button.place(x=366, y=560)
+
+        return download_button, metadata_button, cancel_button, reset_button, resume_button, discard_button
+
+    def _schedule_preview(self):
+        if self._preview_after_id is not None:
+            self.after_cancel(self._preview_after_id)
+        self._preview_after_id = self.after(PREVIEW_DELAY_MS, self._request_preview)
+
+    def _request_preview(self):
+        self._preview_after_id = None
+        if not self._download_controller:
+            return
+        mode = MODE_NAMES[self._mode_var.get()]
+        self._download_controller.preview_requested(
+            self._url_entry.get_entry_text(),
+            mode,
+            self._quality_selector.get_choices(mode),
+            self._dispatched(lambda options: self._on_quality_options(mode, options), coalesce=False),
+        )
+
+    def _download_callbacks(self) -> tuple:
+        return (
+            self._dispatched(self.set_download_enabled, coalesce=False),
+            self._dispatched(self.set_cancel_enabled, coalesce=False),
+            self._dispatched(self.update_progress),
+            self._dispatched(self.update_status),
+        )
 
     def _get_form_data(self):
         base_folder = self._base_folder_entry.get_entry_text() if self._base_folder_entry else ""
@@ -318,7 +390,7 @@ class HomeView(BaseView):
         return {
             "url": self._url_entry.get_entry_text() if self._url_entry else "",
             "path": path if path else "",
-            "mode": "mp3" if self._mode_var.get() == 1 else "mp4",
+            "mode": MODE_NAMES[self._mode_var.get()],
             "quality": self._quality_selector.get_value(),
             "artist": self._artist_entry.get_entry_text() if self._artist_entry else "",
             "album": self._album_entry.get_entry_text() if self._album_entry else "",
@@ -64,7 +64,7 @@ class MetadataView(BaseView):
             data,
             self.set_title,
             self._show_wizard,
-            self._update_status,
+            self._dispatched(self._update_status),
             self._set_next_enabled,
             self._set_back_enabled,
         )
@@ -0,0 +1,55 @@
+import threading
+import tkinter as tk
+from typing import Callable
+from collections import OrderedDict, deque
+
+DEFAULT_FPS = 30
+
+
+class UiDispatcher:
+    # Worker threads post UI updates here; the Tk main loop applies them at a fixed frame rate.
+    # Coalesced callbacks (progress, status) only keep their latest arguments per frame.
+    def __init__(self, root: tk.Misc, fps: int = DEFAULT_FPS):
+        self._root = root
+        self._interval_ms = max(1, int(1000 / fps))
+        self._lock = threading.Lock()
+        self._latest: OrderedDict[Callable, tuple] = OrderedDict()
+        self._ordered: deque[tuple[Callable, tuple]] = deque()
+        self._after_id = None
+
+    # Public Methods
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self._root.after(self._interval_ms, self._drain)
+
+    def stop(self):
+        if self._after_id is not None:
+            self._root.after_cancel(self._after_id)
+            self._after_id = None
+
+    def wrap(self, callback: Callable, coalesce: bool = True) -> Callable:
+        def dispatch(*args):
+            self.post(callback, *args, coalesce=coalesce)
+        return dispatch
+
+    def post(self, callback: Callable, *args, coalesce: bool = True):
+        with self._lock:
+            if coalesce:
+                self._latest.pop(callback, None)
+                self._latest[callback] = args
+            else:
+                self._ordered.append((callback, args))
+
+    # Private Methods
+    def _drain(self):
+        with self._lock:
+            ordered, self._ordered = self._ordered, deque()
+            latest, self._latest = self._latest, OrderedDict()
+
+        for callback, args in list(ordered) + list(latest.items()):
+            try:
+                callback(*args)
+            except Exception:
+                pass  # A failing widget update must not stop the loop
+
+        self._after_id = self._root.after(self._interval_ms, self._drain)